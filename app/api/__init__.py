@@ -1,5 +1,7 @@
 from fastapi import FastAPI
 
+from app.api.account import router as account_router
+from app.api.debug import router as debug_router
 from app.api.hist_mkt_data import router as hist_mkt_data_router
 
 
@@ -8,9 +10,11 @@ def register_routers(app: FastAPI) -> None:
     Register all API routers with the FastAPI application.
 
     This function includes the routers defined across the application
-    modules (e.g., hist_mkt_data) into the main FastAPI app instance.
+    modules (e.g., hist_mkt_data, account, debug) into the main FastAPI app instance.
 
     Args:
         app (FastAPI): The FastAPI application to register routes on.
     """
     app.include_router(hist_mkt_data_router)
+    app.include_router(account_router)
+    app.include_router(debug_router)
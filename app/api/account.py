@@ -0,0 +1,110 @@
+import asyncio
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.ib import IBError
+from app.ib.live_state import LiveIBState, Subscriber, get_live_state
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/account", tags=["Account"])
+
+# Seconds between keep-alive comments on an idle change feed
+_KEEP_ALIVE = 15.0
+
+
+async def _connected_state() -> LiveIBState:
+    """
+    Return the live state, connecting it on first use.
+
+    Raises:
+        HTTPException: With the IB error's status if connecting fails.
+    """
+    state = get_live_state()
+    try:
+        await state.ib()
+    except IBError as e:
+        logger.warning(f"Live IB state unavailable: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+    return state
+
+
+@router.get("/positions")
+async def get_positions(
+    account: str = Query("", description="Account id; empty for all accounts"),
+) -> List[Dict[str, Any]]:
+    """
+    Handle GET request for current positions, served from synced memory.
+    """
+    state = await _connected_state()
+    return await state.positions(account)
+
+
+@router.get("/portfolio")
+async def get_portfolio(
+    account: str = Query("", description="Account id; empty for all accounts"),
+) -> List[Dict[str, Any]]:
+    """
+    Handle GET request for current portfolio items, served from synced memory.
+    """
+    state = await _connected_state()
+    return await state.portfolio(account)
+
+
+@router.get("/values")
+async def get_account_values(
+    account: str = Query("", description="Account id; empty for all accounts"),
+) -> List[Dict[str, Any]]:
+    """
+    Handle GET request for current account values, served from synced memory.
+    """
+    state = await _connected_state()
+    return await state.account_values(account)
+
+
+@router.get("/openOrders")
+async def get_open_orders() -> List[Dict[str, Any]]:
+    """
+    Handle GET request for open orders, served from synced memory.
+    """
+    state = await _connected_state()
+    return await state.open_orders()
+
+
+async def _event_stream(
+    request: Request, state: LiveIBState, subscriber: Subscriber
+) -> AsyncIterator[str]:
+    """Yield change-feed events as Server-Sent Events until the client leaves."""
+    try:
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), _KEEP_ALIVE)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            if subscriber.overflowed:
+                # Events were dropped; clients should re-read the snapshots
+                subscriber.overflowed = False
+                yield "event: overflow\ndata: {}\n\n"
+            yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+    finally:
+        state.unsubscribe(subscriber)
+
+
+@router.get("/stream")
+async def stream_account_changes(request: Request) -> StreamingResponse:
+    """
+    Handle GET request for a Server-Sent Events feed of account changes.
+
+    Emits ``position``, ``portfolio``, ``accountValue`` and ``order`` events
+    as IB pushes updates, so clients do not need to poll.
+    """
+    state = await _connected_state()
+    subscriber = state.subscribe()
+    return StreamingResponse(
+        _event_stream(request, state, subscriber), media_type="text/event-stream"
+    )
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import math
+from collections import Counter, deque
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Deque, Optional
+
+from fastapi import HTTPException, Request
+
+from app.ib.pacing import PacingBudget, get_pacing_budget
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def client_id(request: Request) -> str:
+    """Identify the caller by its X-Client-Id header, else its address."""
+    header = request.headers.get("X-Client-Id")
+    if header:
+        return header
+    return request.client.host if request.client else "unknown"
+
+
+class AdmissionController:
+    """
+    Bound the IB-bound requests an endpoint accepts.
+
+    At most ``max_in_flight`` requests run at once and each client may hold
+    ``max_per_client`` of them (running or queued). Others wait in a bounded
+    FIFO queue. Requests that would exceed the queue, or whose projected wait
+    for the IB pacing budget exceeds ``max_wait``, are rejected right away
+    with 429 and a Retry-After derived from the pacing budget.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_in_flight: int = 8,
+        max_per_client: int = 2,
+        max_queue: int = 32,
+        max_wait: float = 30.0,
+        pacing: Optional[PacingBudget] = None,
+    ) -> None:
+        """
+        Args:
+            name (str): Endpoint name, used in logs.
+            max_in_flight (int): Requests allowed to run concurrently.
+            max_per_client (int): Running plus queued requests per client.
+            max_queue (int): Requests allowed to wait for a free slot.
+            max_wait (float): Longest wait in seconds before rejecting.
+            pacing (Optional[PacingBudget]): Defaults to the shared budget.
+        """
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_per_client = max_per_client
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.pacing = pacing or get_pacing_budget()
+        self._in_flight = 0
+        self._clients: Counter[str] = Counter()
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        """Requests currently running."""
+        return self._in_flight
+
+    @property
+    def queued(self) -> int:
+        """Requests currently waiting for a slot."""
+        return len(self._waiters)
+
+    def _reject(self, reason: str, retry_after: float) -> HTTPException:
+        retry_after = max(1, math.ceil(retry_after))
+        logger.warning(f"Rejected {self.name} request: {reason}")
+        return HTTPException(
+            status_code=429,
+            detail=f"{reason}; retry after {retry_after}s",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    def _leave(self, client: str) -> None:
+        self._clients[client] -= 1
+        if self._clients[client] <= 0:
+            del self._clients[client]
+
+    async def acquire(self, client: str) -> None:
+        """
+        Wait for a slot for a request from ``client``.
+
+        Raises:
+            HTTPException: 429 when the client, the queue or the pacing
+                budget is over its limit, or no slot frees up in time.
+        """
+        wait = self.pacing.projected_wait(ahead=len(self._waiters))
+        if self._clients[client] >= self.max_per_client:
+            raise self._reject("Too many concurrent requests from this client", wait)
+        if wait > self.max_wait:
+            raise self._reject("IB pacing budget exhausted", wait)
+
+        self._clients[client] += 1
+        if self._in_flight < self.max_in_flight and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._leave(client)
+            raise self._reject("Request queue is full", wait)
+
+        waiter: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except BaseException as exc:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self._release_slot()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._leave(client)
+            if isinstance(exc, asyncio.TimeoutError):
+                wait = self.pacing.projected_wait(ahead=len(self._waiters))
+                raise self._reject("Timed out waiting for a free slot", wait)
+            raise
+
+    def check_pacing(self, requests: int) -> None:
+        """
+        Check that an admitted request sending ``requests`` historical
+        requests can get them through the pacing budget within ``max_wait``.
+
+        Raises:
+            HTTPException: 429 when the budget cannot fit them in time.
+        """
+        wait = self.pacing.projected_wait(ahead=max(0, requests - 1))
+        if wait > self.max_wait:
+            raise self._reject(
+                f"IB pacing budget cannot fit {requests} historical requests", wait
+            )
+
+    def _release_slot(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot straight to the next waiter
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    def release(self, client: str) -> None:
+        """Free the slot held by a finished request from ``client``."""
+        self._leave(client)
+        self._release_slot()
+
+
+@lru_cache()
+def get_admission_controller(name: str) -> Optional[AdmissionController]:
+    """
+    Return the admission controller of an endpoint, or None when admission
+    control is disabled.
+    """
+    admission = get_settings().admission
+    if not admission.enabled:
+        return None
+    return AdmissionController(
+        name,
+        max_in_flight=admission.max_in_flight,
+        max_per_client=admission.max_per_client,
+        max_queue=admission.max_queue,
+        max_wait=admission.max_wait,
+    )
+
+
+def admission(name: str) -> Callable[[Request], AsyncIterator[None]]:
+    """
+    Build a FastAPI dependency holding an admission slot of endpoint
+    ``name`` for the duration of the request.
+    """
+
+    async def dependency(request: Request) -> AsyncIterator[None]:
+        controller = get_admission_controller(name)
+        if controller is None:
+            yield
+            return
+        client = client_id(request)
+        await controller.acquire(client)
+        try:
+            yield
+        finally:
+            controller.release(client)
+
+    return dependency
@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import threading
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.settings import get_settings
+from app.utils.sampler import sample_thread, to_collapsed
+
+logger = logging.getLogger(__name__)
+router = APIRouter(prefix="/debug", tags=["Debug"])
+
+# Only one sampling profile may run at a time
+_profile_lock = asyncio.Lock()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def get_profile(
+    seconds: float = Query(5.0, gt=0, description="Sampling duration in seconds"),
+    interval_ms: float = Query(
+        5.0, ge=1, le=1000, description="Milliseconds between samples"
+    ),
+) -> PlainTextResponse:
+    """
+    Sample the event loop thread's stacks for a bounded time.
+
+    The loop keeps serving requests while a helper thread samples it, so the
+    profile shows where request handling actually spends its time. The
+    result is in collapsed stack format, ready for flamegraph.pl or
+    speedscope.
+
+    Args:
+        seconds (float): Sampling duration, capped by the profiling settings.
+        interval_ms (float): Milliseconds between samples.
+
+    Returns:
+        PlainTextResponse: One ``stack count`` line per distinct stack.
+
+    Raises:
+        HTTPException: 404 if profiling is disabled, 409 if a profile is
+            already running.
+    """
+    profiling = get_settings().profiling
+    if not profiling.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if _profile_lock.locked():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+
+    async with _profile_lock:
+        duration = min(seconds, profiling.max_profile_seconds)
+        loop_thread = threading.get_ident()
+        logger.info(f"Sampling event loop for {duration:.1f}s")
+        counts = await asyncio.to_thread(
+            sample_thread, loop_thread, duration, interval_ms / 1000
+        )
+    return PlainTextResponse(to_collapsed(counts))
@@ -1,18 +1,405 @@
+import asyncio
+import datetime as dt
 import logging
-from typing import Any, Dict, List, Optional
+import time
+from typing import Any, Dict, List, Literal, Optional, Tuple
+from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, HTTPException, Query
-from ib_insync import Contract
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from ib_insync import IB, BarData, Contract
 
-from app.ib import IBClientManager
+from app.api.admission import admission, get_admission_controller
+from app.data import BarKey, BarSeries, Panel, get_bar_store
+from app.data.availability import (
+    HeadKey,
+    HeadTimestampIndex,
+    clip_duration,
+    get_head_timestamp_index,
+    min_duration,
+    parse_end_datetime,
+)
+from app.data.series_cache import (
+    SeriesCache,
+    decode_cursor,
+    duration_since,
+    get_series_cache,
+)
+from app.ib import Deadline, IBClientManager, IBError, call_with_retries
+from app.ib.contracts import ContractSpec, contract_key, contract_spec
+from app.ib.pacing import paced
+from app.settings import get_settings
+from app.utils.tracing import span
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/histMktData", tags=["Historical Market Data"])
 
+_FORMAT_DESCRIPTION = (
+    "Response layout (default: 'records').\n"
+    " - records: one object per bar\n"
+    " - columns: one array per field, with epoch-second timestamps"
+)
 
-@router.get("/")
+# Each panel symbol costs one historical request against IB pacing
+_MAX_PANEL_SYMBOLS = 50
+# Panel symbols fetched at once over the shared connection
+_MAX_PANEL_CONCURRENCY = 8
+
+
+_TIMEZONE_DESCRIPTION = (
+    "Timezone of record dates (default: 'local').\n"
+    " - local: TWS local time with its UTC offset, e.g. '2024-07-10T09:30:00-04:00'\n"
+    " - utc: ISO-8601 UTC, e.g. '2024-07-10T13:30:00Z'"
+)
+
+
+def _record_timezone(timezone: str) -> Optional[dt.tzinfo]:
+    """
+    Return the timezone record dates are formatted in: UTC, or the TWS
+    timezone from settings (None for the system timezone).
+    """
+    if timezone == "utc":
+        return dt.timezone.utc
+    tws_timezone = get_settings().ib.timezone
+    return ZoneInfo(tws_timezone) if tws_timezone else None
+
+
+def _encode(series: BarSeries, format: str, timezone: str = "local") -> Response:
+    """Serialize a bar series in the requested response layout."""
+    with span("encode", format=format, bars=len(series)):
+        content = series.to_json(format, _record_timezone(timezone))
+    return Response(content, media_type="application/json")
+
+
+def _to_epoch(value: Optional[dt.datetime]) -> Optional[int]:
+    """Convert an optional datetime (naive = UTC) to epoch seconds."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=dt.timezone.utc)
+    return int(value.timestamp())
+
+
+async def _resolve_contract(ib: IB, spec: ContractSpec, deadline: Deadline) -> Contract:
+    """
+    Turn a contract spec into a contract usable for historical requests.
+
+    Fully-specified specs (including any with a conId) are used as-is, saving
+    a round trip. Otherwise the first match from contract details is used;
+    it is already fully qualified by IB.
+
+    Raises:
+        HTTPException: 404 if IB finds no matching contract.
+    """
+    contract = spec.to_contract()
+    if spec.is_fully_specified:
+        return contract
+
+    contract_details = await call_with_retries(
+        lambda: ib.reqContractDetailsAsync(contract),
+        deadline=deadline,
+        phase="contract details",
+    )
+    if not contract_details:
+        raise HTTPException(
+            status_code=404, detail=f"No contract found for {spec.describe()}"
+        )
+
+    if not contract_details[0].contract:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No valid contract found for {spec.describe()}",
+        )
+
+    return contract_details[0].contract
+
+
+async def _fetch_bars(
+    ib: IB,
+    contract: Contract,
+    duration: str,
+    bar_size: str,
+    what_to_show: str,
+    use_rth: bool,
+    end_datetime: Optional[str],
+    deadline: Deadline,
+) -> BarSeries:
+    """
+    Request historical bars for a contract and convert them to a BarSeries.
+
+    An IB "no data" answer yields an empty series.
+    """
+    bars: List[BarData]
+    try:
+        bars = await call_with_retries(
+            paced(
+                lambda: ib.reqHistoricalDataAsync(
+                    contract,
+                    endDateTime=end_datetime or "",  # empty string means "now"
+                    durationStr=duration,
+                    barSizeSetting=bar_size,
+                    whatToShow=what_to_show,
+                    useRTH=use_rth,
+                    formatDate=2,  # UTC epoch timestamps
+                ),
+                deadline=deadline,
+            ),
+            deadline=deadline,
+            phase="historical data",
+        )
+    except IBError as e:
+        if not e.no_data:
+            raise
+        bars = []
+
+    return BarSeries.from_bars(bars)
+
+
+async def _fetch_head_timestamp(
+    ib: IB, contract: Contract, what_to_show: str, use_rth: bool, deadline: Deadline
+) -> int:
+    """Request the earliest available data point for a contract, in epoch seconds."""
+    head = await call_with_retries(
+        paced(
+            lambda: ib.reqHeadTimeStampAsync(
+                contract, whatToShow=what_to_show, useRTH=use_rth, formatDate=2
+            ),
+            deadline=deadline,
+        ),
+        deadline=deadline,
+        phase="head timestamp",
+    )
+    if not isinstance(head, dt.datetime):
+        head = dt.datetime(head.year, head.month, head.day)
+    return _to_epoch(head) or 0
+
+
+async def _index_head_timestamp(
+    ib: IB,
+    contract: Contract,
+    key: HeadKey,
+    index: HeadTimestampIndex,
+    deadline: Deadline,
+) -> Optional[int]:
+    """
+    Fetch and record a head timestamp; failures only disable range clipping
+    and are recorded so they are not retried for a while.
+    """
+    try:
+        head = await _fetch_head_timestamp(
+            ib, contract, key.what_to_show, key.use_rth, deadline
+        )
+    except IBError as e:
+        logger.warning(f"Could not fetch head timestamp for {key}: {e}")
+        # Remember the failure so later requests skip the paced lookup
+        index.put_failure(key, str(e))
+        return None
+    index.put(key, head)
+    return head
+
+
+def _clip_to_head(
+    spec: ContractSpec, duration: str, end_datetime: Optional[str], head: int
+) -> str:
+    """
+    Shorten ``duration`` so the request does not reach before ``head``.
+
+    Raises:
+        HTTPException: 404 if the whole requested range precedes ``head``.
+    """
+    try:
+        end = parse_end_datetime(end_datetime, time.time())
+        clipped = clip_duration(duration, end, head)
+    except ValueError:
+        # Leave unparsable values for IB to validate
+        return duration
+
+    if clipped is None:
+        earliest = dt.datetime.fromtimestamp(head, dt.timezone.utc).isoformat()
+        raise HTTPException(
+            status_code=404,
+            detail=f"No data available for {spec.describe()} before {earliest}",
+        )
+    if clipped != duration:
+        logger.info(f"Clipped duration {duration!r} to {clipped!r} at head timestamp")
+    return clipped
+
+
+async def _store_bars(
+    contract: Contract,
+    bar_size: str,
+    what_to_show: str,
+    use_rth: bool,
+    series: BarSeries,
+) -> None:
+    """
+    Append fetched bars to the bar store, if enabled, off the event loop.
+
+    The store is keyed by conId only, the key /histMktData/stored and stored
+    panels read by, so bars of contracts whose conId is unknown (fully
+    specified without one) are not stored.
+    """
+    store = get_bar_store()
+    if store is None:
+        return
+    if not contract.conId:
+        logger.debug(f"Not storing bars of {contract_key(contract)}: conId unknown")
+        return
+    key = BarKey(str(contract.conId), bar_size, what_to_show, use_rth)
+    try:
+        await asyncio.to_thread(store.append, key, series)
+    except Exception:
+        # Storage is a cache; never fail the request because of it
+        logger.exception(f"Failed to store bars for {key}")
+
+
+def _resume_timestamp(
+    since: Optional[str], cursor: Optional[str], key: BarKey
+) -> Optional[int]:
+    """
+    Return the inclusive epoch second to resume a polling client from.
+
+    Raises:
+        HTTPException: 422 if both or invalid values are given.
+    """
+    if since is not None and cursor is not None:
+        raise HTTPException(
+            status_code=422, detail="Only one of 'since' and 'cursor' may be given"
+        )
+    if cursor is not None:
+        try:
+            return decode_cursor(cursor, key)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Invalid cursor: {e}")
+    if since is None:
+        return None
+
+    try:
+        after = int(float(since))
+    except ValueError:
+        try:
+            parsed = dt.datetime.fromisoformat(since.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise HTTPException(
+                status_code=422,
+                detail="'since' must be epoch seconds or an ISO-8601 datetime",
+            )
+        after = _to_epoch(parsed) or 0
+    # Bars strictly newer than 'since'
+    return after + 1
+
+
+def _reach_back(duration: str, start: int, bar_size: str) -> str:
+    """
+    Widen ``duration`` so a window ending now reaches back to ``start``,
+    letting ``since``/``cursor`` requests get every newer bar even when they
+    are not served from the series cache.
+
+    Raises:
+        HTTPException: 422 if the window cannot be widened to ``start``.
+    """
+    now = time.time()
+    try:
+        if start >= now - min_duration(duration):
+            return duration
+        widened = duration_since(start, now, bar_size)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Cannot request every bar since {start}: {e}",
+        )
+    logger.info(f"Widened duration {duration!r} to {widened!r} to reach {start}")
+    return widened
+
+
+async def _fetch_window(
+    spec: ContractSpec,
+    duration: str,
+    bar_size: str,
+    what_to_show: str,
+    use_rth: bool,
+    end_datetime: Optional[str],
+    head_key: HeadKey,
+    head: Optional[int],
+    deadline: Deadline,
+) -> Tuple[BarSeries, Contract]:
+    """
+    Fetch the full requested window, clipped to the contract's head
+    timestamp, and append it to the bar store.
+
+    Returns:
+        Tuple[BarSeries, Contract]: The bars and the resolved contract.
+    """
+    index = get_head_timestamp_index()
+    async with IBClientManager(deadline=deadline) as ib:
+        contract = await _resolve_contract(ib, spec, deadline)
+        if index is not None and head is None and not index.failed(head_key):
+            head = await _index_head_timestamp(ib, contract, head_key, index, deadline)
+            if head is not None:
+                duration = _clip_to_head(spec, duration, end_datetime, head)
+
+        series = await _fetch_bars(
+            ib,
+            contract,
+            duration=duration,
+            bar_size=bar_size,
+            what_to_show=what_to_show,
+            use_rth=use_rth,
+            end_datetime=end_datetime,
+            deadline=deadline,
+        )
+    await _store_bars(contract, bar_size, what_to_show, use_rth, series)
+    return series, contract
+
+
+async def _refresh_cached(
+    cache: SeriesCache,
+    key: BarKey,
+    spec: ContractSpec,
+    bar_size: str,
+    what_to_show: str,
+    use_rth: bool,
+    start: int,
+    deadline: Deadline,
+) -> Optional[BarSeries]:
+    """
+    Bring a cached series up to date by fetching only the bars after its
+    last one, with the contract resolved when it was first fetched.
+
+    Returns:
+        Optional[BarSeries]: The refreshed series, or None if it is not
+        cached or the cached bars begin after ``start``.
+    """
+    async with cache.lock(key):
+        entry = cache.get(key)
+        if entry is None or not cache.covers(entry, start):
+            return None
+        if cache.is_fresh(entry):
+            return entry.series
+        try:
+            duration = cache.tail_duration(entry.series, bar_size)
+        except ValueError:
+            return None
+
+        async with IBClientManager(deadline=deadline) as ib:
+            contract = entry.contract or await _resolve_contract(ib, spec, deadline)
+            tail = await _fetch_bars(
+                ib,
+                contract,
+                duration=duration,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                use_rth=use_rth,
+                end_datetime=None,
+                deadline=deadline,
+            )
+        await _store_bars(contract, bar_size, what_to_show, use_rth, tail)
+        logger.info(f"Refreshed cached series {key} with {len(tail)} bars")
+        return cache.merge(key, tail, contract)
+
+
+@router.get("/", response_model=None, dependencies=[Depends(admission("histMktData"))])
 async def get_hist_market_data(
-    symbol: str = Query(..., description="The symbol to fetch data for"),
+    spec: ContractSpec = Depends(contract_spec),
     duration: str = Query(
         "1 D",
         description=(
@@ -62,52 +449,410 @@ async def get_hist_market_data(
         None,
         description="End datetime in IB format (e.g., '20240710 14:00:00'). Use empty or None for current time.",
     ),
-) -> List[Dict[str, Any]]:
+    format: Literal["records", "columns"] = Query(
+        "records", description=_FORMAT_DESCRIPTION
+    ),
+    timezone: Literal["local", "utc"] = Query(
+        "local", description=_TIMEZONE_DESCRIPTION
+    ),
+    timeout: Optional[float] = Query(
+        None,
+        gt=0,
+        description="Request timeout in seconds, capped by the server's configured limit.",
+    ),
+    since: Optional[str] = Query(
+        None,
+        description=(
+            "Only return bars newer than this time (epoch seconds or ISO-8601, "
+            "naive values are UTC). Not combinable with end_datetime."
+        ),
+    ),
+    cursor: Optional[str] = Query(
+        None,
+        description=(
+            "Opaque cursor from a previous response's X-Next-Cursor header; "
+            "returns only bars after those already received."
+        ),
+    ),
+) -> Response:
     """
     Handle GET request to fetch historical market data asynchronously.
+
+    A ``con_id`` or fully-specified contract is requested directly; otherwise
+    the contract is looked up first. Ranges are clipped to the contract's
+    earliest available data, and ranges entirely before it are rejected,
+    using the cached head timestamp index. All IB calls share one deadline
+    derived from the request timeout; IB errors are reported with a matching
+    HTTP status. Fetched bars are also appended to the on-disk bar store when
+    it is enabled.
+
+    Polling clients pass ``since`` or ``cursor`` to receive only newer bars.
+    Such requests are served from the in-memory series cache, which fetches
+    only the bars after its last one from IB. Responses for the current time
+    carry an ``X-Next-Cursor`` header to resume from.
     """
     logger.info(
         "Historical data request: "
-        f"symbol={symbol}, duration={duration}, bar_size={bar_size}, "
+        f"contract={spec}, duration={duration}, bar_size={bar_size}, "
         f"what_to_show={what_to_show}, use_rth={use_rth}, end_datetime={end_datetime}"
     )
 
+    if (since is not None or cursor is not None) and end_datetime:
+        raise HTTPException(
+            status_code=422,
+            detail="'since' and 'cursor' cannot be combined with 'end_datetime'",
+        )
+    spec_key = contract_key(spec.to_contract())
+    series_key = BarKey(spec_key, bar_size, what_to_show, use_rth)
+    start = _resume_timestamp(since, cursor, series_key)
+    # Only series ending now can be extended incrementally
+    cache = get_series_cache() if not end_datetime else None
+
+    if start is not None:
+        # Cache misses fetch the window, which must reach back to 'start'
+        duration = _reach_back(duration, start, bar_size)
+
+    # Known head timestamps reject impossible ranges before contacting IB
+    index = get_head_timestamp_index()
+    head_key = HeadKey(spec_key, what_to_show, use_rth)
+    head = index.get(head_key) if index is not None else None
+    if head is not None:
+        duration = _clip_to_head(spec, duration, end_datetime, head)
+
+    request_timeout = get_settings().ib.request_timeout
+    deadline = Deadline(min(timeout or request_timeout, request_timeout))
+
     try:
-        async with IBClientManager() as ib:
-            contract = Contract(
-                symbol=symbol, secType="STK", exchange="SMART", currency="USD"
+        series = None
+        if cache is not None and start is not None:
+            series = await _refresh_cached(
+                cache,
+                series_key,
+                spec,
+                bar_size,
+                what_to_show,
+                use_rth,
+                start,
+                deadline,
             )
-            contract_details = await ib.reqContractDetailsAsync(contract)
-            if not contract_details:
-                raise HTTPException(
-                    status_code=404, detail=f"No contract found for symbol '{symbol}'"
-                )
+        if series is None:
+            series, contract = await _fetch_window(
+                spec,
+                duration=duration,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                use_rth=use_rth,
+                end_datetime=end_datetime,
+                head_key=head_key,
+                head=head,
+                deadline=deadline,
+            )
+            if cache is not None:
+                # Keep cached history the window does not reach back to
+                cache.merge(series_key, series, contract)
+    except HTTPException:
+        raise
+    except IBError as e:
+        logger.warning(f"Failed to fetch historical market data: {e}")
+        raise HTTPException(status_code=e.status_code, detail=str(e), headers=e.headers)
+    except Exception as e:
+        logger.exception("Failed to fetch historical market data")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    response = _encode(series.between(start, None), format, timezone)
+    if cache is not None:
+        response.headers["X-Next-Cursor"] = cache.next_cursor(
+            series_key, series, bar_size
+        )
+    return response
 
-            if not contract_details[0].contract:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"No valid contract found for symbol '{symbol}'",
-                )
 
-            qualified_contracts = await ib.qualifyContractsAsync(
-                contract_details[0].contract
+@router.get("/stored", response_model=None)
+async def get_stored_market_data(
+    con_id: int = Query(..., description="IB contract id (conId) of the series"),
+    bar_size: str = Query("1 min", description="Bar size of the stored series"),
+    what_to_show: str = Query("TRADES", description="Data type of the series"),
+    use_rth: bool = Query(True, description="Whether the series is RTH only"),
+    start: Optional[dt.datetime] = Query(
+        None,
+        description="Inclusive start (ISO-8601, naive values are UTC). Omit for the first bar.",
+    ),
+    end: Optional[dt.datetime] = Query(
+        None,
+        description="Exclusive end (ISO-8601, naive values are UTC). Omit for the last bar.",
+    ),
+    format: Literal["records", "columns"] = Query(
+        "records", description=_FORMAT_DESCRIPTION
+    ),
+    timezone: Literal["local", "utc"] = Query(
+        "local", description=_TIMEZONE_DESCRIPTION
+    ),
+) -> Response:
+    """
+    Handle GET request to read a time range from the on-disk bar store.
+
+    Bars are served from memory-mapped files without contacting IB.
+    """
+    store = get_bar_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Bar storage is disabled")
+
+    key = BarKey(str(con_id), bar_size, what_to_show, use_rth)
+    series = store.read_range(key, _to_epoch(start), _to_epoch(end))
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"No stored bars for {key}")
+
+    return _encode(series, format, timezone)
+
+
+def _panel_specs(
+    symbols: List[str], sec_type: str, exchange: str, currency: str
+) -> Dict[str, ContractSpec]:
+    """
+    Parse panel symbols (repeated or comma-separated) into contract specs by
+    label. Purely numeric entries are taken as conIds.
+
+    Raises:
+        HTTPException: 422 if no symbols or too many are given.
+    """
+    labels = dict.fromkeys(
+        item.strip() for value in symbols for item in value.split(",") if item.strip()
+    )
+    if not labels:
+        raise HTTPException(status_code=422, detail="At least one symbol is required")
+    if len(labels) > _MAX_PANEL_SYMBOLS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"At most {_MAX_PANEL_SYMBOLS} symbols are allowed per panel",
+        )
+
+    specs = {}
+    for label in labels:
+        if label.isdigit():
+            specs[label] = ContractSpec(con_id=int(label), exchange=exchange)
+        else:
+            specs[label] = ContractSpec(
+                symbol=label, sec_type=sec_type, exchange=exchange, currency=currency
             )
-            contract = qualified_contracts[0]
+    return specs
+
+
+async def _fetch_panel_series(
+    specs: Dict[str, ContractSpec],
+    duration: str,
+    bar_size: str,
+    what_to_show: str,
+    use_rth: bool,
+    end_datetime: Optional[str],
+    deadline: Deadline,
+) -> Dict[str, BarSeries]:
+    """Fetch the series of every panel contract concurrently over one connection."""
+    limit = asyncio.Semaphore(_MAX_PANEL_CONCURRENCY)
 
-            bars = await ib.reqHistoricalDataAsync(
+    async def fetch(ib: IB, spec: ContractSpec) -> BarSeries:
+        async with limit:
+            contract = await _resolve_contract(ib, spec, deadline)
+            series = await _fetch_bars(
+                ib,
                 contract,
-                endDateTime=end_datetime or "",  # empty string means "now"
-                durationStr=duration,
-                barSizeSetting=bar_size,
-                whatToShow=what_to_show,
-                useRTH=use_rth,
-                formatDate=1,
+                duration=duration,
+                bar_size=bar_size,
+                what_to_show=what_to_show,
+                use_rth=use_rth,
+                end_datetime=end_datetime,
+                deadline=deadline,
             )
+        await _store_bars(contract, bar_size, what_to_show, use_rth, series)
+        return series
 
-            return [bar.__dict__ for bar in bars]
+    async with IBClientManager(deadline=deadline) as ib:
+        tasks = [asyncio.ensure_future(fetch(ib, spec)) for spec in specs.values()]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+    return dict(zip(specs, results))
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.exception("Failed to fetch historical market data")
-        raise HTTPException(status_code=500, detail=str(e))
+
+def _read_panel_series(
+    specs: Dict[str, ContractSpec],
+    bar_size: str,
+    what_to_show: str,
+    use_rth: bool,
+    start: Optional[int],
+    end: Optional[int],
+) -> Dict[str, BarSeries]:
+    """
+    Read the series of every panel contract from the bar store.
+
+    Raises:
+        HTTPException: 404 if storage is disabled, 422 if a label is not a conId.
+    """
+    store = get_bar_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Bar storage is disabled")
+
+    result = {}
+    for label, spec in specs.items():
+        if not spec.con_id:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Stored panels are keyed by conId, got '{label}'",
+            )
+        key = BarKey(str(spec.con_id), bar_size, what_to_show, use_rth)
+        series = store.read_range(key, start, end)
+        result[label] = series if series is not None else BarSeries.empty()
+    return result
+
+
+@router.get("/panel", response_model=None, dependencies=[Depends(admission("panel"))])
+async def get_panel(
+    symbols: List[str] = Query(
+        ...,
+        description=(
+            "Symbols to align, repeated or comma-separated (e.g. 'AAPL,MSFT'). "
+            "Numeric entries are IB contract ids."
+        ),
+    ),
+    sec_type: str = Query("STK", description="Security type of the symbols"),
+    exchange: str = Query("SMART", description="Destination exchange"),
+    currency: str = Query("USD", description="Currency of the symbols"),
+    field: Literal["open", "high", "low", "close", "volume", "average", "bar_count"] = (
+        Query("close", description="Bar field to align (default: 'close')")
+    ),
+    join: Literal["outer", "inner"] = Query(
+        "outer",
+        description=(
+            "Timestamp grid (default: 'outer').\n"
+            " - outer: every timestamp of any symbol\n"
+            " - inner: only timestamps present for all symbols"
+        ),
+    ),
+    ffill: bool = Query(
+        False, description="Fill gaps with each symbol's previous value"
+    ),
+    source: Literal["ib", "stored"] = Query(
+        "ib",
+        description=(
+            "Where bars come from (default: 'ib').\n"
+            " - ib: fetch 'duration' up to 'end_datetime'\n"
+            " - stored: read 'start' to 'end' from the bar store (conIds only)"
+        ),
+    ),
+    duration: str = Query("1 D", description="Duration string, as for /histMktData/"),
+    bar_size: str = Query("1 min", description="Bar size, as for /histMktData/"),
+    what_to_show: str = Query("TRADES", description="The type of data to request"),
+    use_rth: bool = Query(True, description="Use Regular Trading Hours only"),
+    end_datetime: Optional[str] = Query(
+        None, description="End datetime in IB format; empty for the current time"
+    ),
+    start: Optional[dt.datetime] = Query(
+        None, description="Inclusive start of stored bars (ISO-8601, naive is UTC)"
+    ),
+    end: Optional[dt.datetime] = Query(
+        None, description="Exclusive end of stored bars (ISO-8601, naive is UTC)"
+    ),
+    timeout: Optional[float] = Query(
+        None,
+        gt=0,
+        description="Request timeout in seconds, capped by the server's configured limit.",
+    ),
+) -> Response:
+    """
+    Handle GET request for one field of several symbols on a common time grid.
+
+    Series are fetched from IB concurrently over a single connection (or
+    read from the bar store), joined on their timestamps and returned as a
+    dense matrix: a ``timestamp`` column plus one column per symbol, with
+    null where a symbol has no bar.
+    """
+    specs = _panel_specs(symbols, sec_type, exchange, currency)
+    logger.info(
+        f"Panel request: symbols={list(specs)}, field={field}, join={join}, "
+        f"source={source}, bar_size={bar_size}, duration={duration}"
+    )
+
+    if source == "stored":
+        series = await asyncio.to_thread(
+            _read_panel_series,
+            specs,
+            bar_size,
+            what_to_show,
+            use_rth,
+            _to_epoch(start),
+            _to_epoch(end),
+        )
+    else:
+        controller = get_admission_controller("panel")
+        if controller is not None:
+            # Admission counted the panel as one request; it sends one per symbol
+            controller.check_pacing(len(specs))
+        request_timeout = get_settings().ib.request_timeout
+        deadline = Deadline(min(timeout or request_timeout, request_timeout))
+        try:
+            series = await _fetch_panel_series(
+                specs, duration, bar_size, what_to_show, use_rth, end_datetime, deadline
+            )
+        except HTTPException:
+            raise
+        except IBError as e:
+            logger.warning(f"Failed to fetch panel data: {e}")
+            raise HTTPException(
+                status_code=e.status_code, detail=str(e), headers=e.headers
+            )
+        except Exception as e:
+            logger.exception("Failed to fetch panel data")
+            raise HTTPException(status_code=500, detail=str(e))
+
+    with span("encode", format="panel", symbols=len(series)):
+        panel = Panel.align(series, field=field, how=join, ffill=ffill)
+        return Response(panel.to_json(), media_type="application/json")
+
+
+@router.get("/headTimestamp", dependencies=[Depends(admission("headTimestamp"))])
+async def get_head_timestamp(
+    spec: ContractSpec = Depends(contract_spec),
+    what_to_show: str = Query("TRADES", description="The type of data to check"),
+    use_rth: bool = Query(True, description="Use Regular Trading Hours only"),
+    refresh: bool = Query(False, description="Re-fetch from IB even if cached"),
+) -> Dict[str, Any]:
+    """
+    Handle GET request for the earliest available data of a contract.
+
+    Answers from the cached index when possible and asks IB otherwise.
+    """
+    index = get_head_timestamp_index()
+    if index is None:
+        raise HTTPException(status_code=404, detail="Head timestamp index is disabled")
+
+    key = HeadKey(contract_key(spec.to_contract()), what_to_show, use_rth)
+    head = None if refresh else index.get(key)
+    if head is None:
+        deadline = Deadline(get_settings().ib.request_timeout)
+        try:
+            async with IBClientManager(deadline=deadline) as ib:
+                contract = await _resolve_contract(ib, spec, deadline)
+                head = await _fetch_head_timestamp(
+                    ib, contract, what_to_show, use_rth, deadline
+                )
+        except IBError as e:
+            logger.warning(f"Failed to fetch head timestamp: {e}")
+            raise HTTPException(
+                status_code=e.status_code, detail=str(e), headers=e.headers
+            )
+        index.put(key, head)
+
+    entry = index.entry(key)
+    assert entry is not None
+    return entry
+
+
+@router.get("/headTimestamps")
+async def list_head_timestamps() -> List[Dict[str, Any]]:
+    """
+    Handle GET request listing every cached head timestamp, to plan downloads.
+    """
+    index = get_head_timestamp_index()
+    return index.entries() if index is not None else []
@@ -1,9 +1,56 @@
-from typing import Optional
+import asyncio
+import contextlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Optional
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 
 from app.api import register_routers
+from app.ib.live_state import get_live_state
 from app.settings import get_settings
+from app.utils.loop_monitor import (
+    install_slow_callback_detector,
+    monitor_loop_lag,
+    uninstall_slow_callback_detector,
+)
+from app.utils.tracing import get_tracer, request_span
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Start the opt-in event-loop monitors and release long-lived IB
+    resources when the server shuts down.
+    """
+    profiling = get_settings().profiling
+    lag_task: Optional[asyncio.Task[None]] = None
+    if profiling.enabled:
+        install_slow_callback_detector(profiling.slow_callback_threshold)
+        lag_task = asyncio.create_task(
+            monitor_loop_lag(profiling.loop_lag_interval, profiling.loop_lag_threshold)
+        )
+
+    yield
+
+    if lag_task is not None:
+        lag_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await lag_task
+        uninstall_slow_callback_detector()
+        tracer = get_tracer()
+        if tracer is not None:
+            tracer.close()
+    get_live_state().close()
+
+
+async def _trace_request(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Record each request as a root span that IB call spans nest under."""
+    with request_span(f"{request.method} {request.url.path}") as args:
+        response = await call_next(request)
+        args["status"] = response.status_code
+    return response
 
 
 def create_app(config_path: Optional[str] = None) -> FastAPI:
@@ -33,8 +80,12 @@ def create_app(config_path: Optional[str] = None) -> FastAPI:
         redoc_url=settings.fastapi.redoc_url,
         openapi_url=settings.fastapi.openapi_url,
         debug=settings.fastapi.debug,
+        lifespan=_lifespan,
     )
 
+    if settings.profiling.enabled:
+        app.middleware("http")(_trace_request)
+
     # Register all API routers
     register_routers(app)
 
@@ -0,0 +1,16 @@
+from .bar_series import COLUMNS, BarSeries
+from .bar_store import BarKey, BarStore, bar_size_seconds, get_bar_store
+from .panel import Panel
+from .series_cache import SeriesCache, get_series_cache
+
+__all__ = [
+    "BarKey",
+    "BarSeries",
+    "BarStore",
+    "COLUMNS",
+    "Panel",
+    "SeriesCache",
+    "bar_size_seconds",
+    "get_bar_store",
+    "get_series_cache",
+]
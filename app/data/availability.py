@@ -0,0 +1,257 @@
+import datetime as dt
+import json
+import logging
+import math
+import os
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from ib_insync import util
+
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Naive IB end datetimes are in the TWS time zone, which the server does not
+# know; comparisons against the head timestamp allow this much slack.
+_TIMEZONE_SLACK = 86400
+
+# Upper bounds in seconds for IB duration units
+_DURATION_UNITS = {
+    "S": 1,
+    "D": 86400,
+    "W": 7 * 86400,
+    "M": 31 * 86400,
+    "Y": 366 * 86400,
+}
+
+
+# Lower bounds in seconds for IB duration units
+_MIN_DURATION_UNITS = {
+    "S": 1,
+    "D": 86400,
+    "W": 7 * 86400,
+    "M": 28 * 86400,
+    "Y": 365 * 86400,
+}
+
+
+def _split_duration(duration: str) -> Tuple[int, str]:
+    match = re.fullmatch(r"\s*(\d+)\s*([SDWMY])\s*", duration.upper())
+    if not match:
+        raise ValueError(f"Invalid duration '{duration}'")
+    return int(match.group(1)), match.group(2)
+
+
+def parse_duration(duration: str) -> int:
+    """
+    Return an upper bound in seconds for an IB duration string (e.g. '6 M').
+
+    Raises:
+        ValueError: If the duration cannot be parsed.
+    """
+    count, unit = _split_duration(duration)
+    return count * _DURATION_UNITS[unit]
+
+
+def min_duration(duration: str) -> int:
+    """
+    Return a lower bound in seconds for an IB duration string, i.e. how far
+    back a request of that duration is sure to reach.
+
+    Raises:
+        ValueError: If the duration cannot be parsed.
+    """
+    count, unit = _split_duration(duration)
+    return count * _MIN_DURATION_UNITS[unit]
+
+
+def parse_end_datetime(end_datetime: Optional[str], now: float) -> int:
+    """
+    Convert an IB end datetime into epoch seconds.
+
+    Empty values mean "now"; naive values are interpreted as UTC.
+
+    Raises:
+        ValueError: If the value cannot be parsed.
+    """
+    if not end_datetime:
+        return int(now)
+    parsed = util.parseIBDatetime(end_datetime.strip())
+    if not isinstance(parsed, dt.datetime):
+        parsed = dt.datetime(parsed.year, parsed.month, parsed.day)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return int(parsed.timestamp())
+
+
+def clip_duration(duration: str, end: int, head: int) -> Optional[str]:
+    """
+    Limit a request duration to data that can exist.
+
+    Args:
+        duration (str): Requested IB duration string.
+        end (int): Request end in epoch seconds.
+        head (int): Earliest available data in epoch seconds.
+
+    Returns:
+        Optional[str]: The original duration if it starts after ``head``, a
+        shorter duration reaching back to ``head`` otherwise, or None when the
+        whole range ends before ``head``.
+    """
+    if end + _TIMEZONE_SLACK < head:
+        return None
+
+    requested = parse_duration(duration)
+    available = end - head + _TIMEZONE_SLACK
+    if requested <= available:
+        return duration
+
+    if duration.strip().upper().endswith("S") and available < 86400:
+        return f"{available} S"
+    days = math.ceil(available / 86400)
+    # IB rejects day durations above 365; larger spans must use years
+    clipped = f"{days} D" if days <= 365 else f"{math.ceil(days / 365)} Y"
+    return clipped if parse_duration(clipped) < requested else duration
+
+
+class HeadKey(NamedTuple):
+    """Identifies one head timestamp entry."""
+
+    contract: str
+    what_to_show: str
+    use_rth: bool
+
+    def __str__(self) -> str:
+        return (
+            f"{self.contract}|{self.what_to_show.upper()}|"
+            f"{'rth' if self.use_rth else 'all'}"
+        )
+
+
+class HeadTimestampIndex:
+    """
+    Persistent index of the earliest available data per contract.
+
+    Entries come from IB's ``reqHeadTimeStamp`` and change rarely, so they
+    are kept in a small JSON file and refreshed only once older than ``ttl``.
+    Failed lookups are recorded too, as negative entries that suppress
+    further lookups for ``failure_ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]],
+        ttl: float,
+        failure_ttl: float = 3600.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            path (Optional[Union[str, Path]]): JSON file to persist to, or None
+                to keep the index in memory only.
+            ttl (float): Seconds after which an entry is refreshed.
+            failure_ttl (float): Seconds after which a failed lookup is retried.
+            clock (Callable[[], float]): Wall clock, injectable for tests.
+        """
+        self.path = Path(path) if path is not None else None
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self._clock = clock
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None or not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as f:
+                entries: Dict[str, Dict[str, Any]] = json.load(f)
+                return entries
+        except (OSError, ValueError):
+            logger.warning(f"Ignoring unreadable head timestamp index {self.path}")
+            return {}
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(self._entries, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def get(self, key: HeadKey) -> Optional[int]:
+        """Return the head timestamp for ``key`` if known and fresh."""
+        entry = self._entries.get(str(key))
+        if entry is None or entry.get("head") is None:
+            return None
+        if self._clock() - entry["fetched_at"] > self.ttl:
+            return None
+        return int(entry["head"])
+
+    def failed(self, key: HeadKey) -> bool:
+        """True while a recent lookup for ``key`` failed and should not be retried."""
+        entry = self._entries.get(str(key))
+        if entry is None or "failed_at" not in entry:
+            return False
+        return bool(self._clock() - entry["failed_at"] <= self.failure_ttl)
+
+    def put(self, key: HeadKey, head: int) -> None:
+        """Record the head timestamp for ``key`` and persist the index."""
+        self._entries[str(key)] = {
+            **self._describe(key),
+            "head": int(head),
+            "head_timestamp": dt.datetime.fromtimestamp(
+                head, dt.timezone.utc
+            ).isoformat(),
+            "fetched_at": self._clock(),
+        }
+        self._save()
+
+    def put_failure(self, key: HeadKey, error: str) -> None:
+        """
+        Record a failed lookup for ``key`` and persist the index.
+
+        A known but expired head timestamp is kept for reference; it is not
+        served again until a later lookup succeeds.
+        """
+        entry = self._entries.setdefault(
+            str(key), {**self._describe(key), "head": None}
+        )
+        entry["error"] = error
+        entry["failed_at"] = self._clock()
+        self._save()
+
+    @staticmethod
+    def _describe(key: HeadKey) -> Dict[str, Any]:
+        return {
+            "contract": key.contract,
+            "what_to_show": key.what_to_show.upper(),
+            "use_rth": key.use_rth,
+        }
+
+    def entry(self, key: HeadKey) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for ``key``, fresh or not."""
+        return self._entries.get(str(key))
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Return all entries, fresh or not, sorted by key."""
+        return [self._entries[key] for key in sorted(self._entries)]
+
+
+@lru_cache()
+def get_head_timestamp_index() -> Optional[HeadTimestampIndex]:
+    """
+    Return the shared head timestamp index, or None when disabled in settings.
+    """
+    availability = get_settings().availability
+    if not availability.enabled:
+        return None
+    return HeadTimestampIndex(
+        availability.path,
+        ttl=availability.ttl,
+        failure_ttl=availability.failure_ttl,
+    )
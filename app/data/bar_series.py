@@ -0,0 +1,373 @@
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import orjson
+
+# Column names in the order they are stored and serialized
+PRICE_COLUMNS = ("open", "high", "low", "close", "volume", "average")
+COLUMNS = ("timestamp", *PRICE_COLUMNS, "bar_count")
+
+_EPOCH = dt.datetime(1970, 1, 1, tzinfo=dt.timezone.utc)
+
+
+def _to_epoch(value: Any) -> int:
+    """
+    Convert a bar date from ib_insync into epoch seconds (UTC).
+
+    Args:
+        value (Any): A ``datetime.date``, ``datetime.datetime`` or epoch number.
+            Naive datetimes are interpreted as UTC.
+
+    Returns:
+        int: Seconds since the Unix epoch.
+    """
+    if isinstance(value, dt.datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=dt.timezone.utc)
+        return int((value - _EPOCH).total_seconds())
+    if isinstance(value, dt.date):
+        return int(
+            (
+                dt.datetime(value.year, value.month, value.day, tzinfo=dt.timezone.utc)
+                - _EPOCH
+            ).total_seconds()
+        )
+    return int(value)
+
+
+@dataclass(frozen=True, eq=False)
+class BarSeries:
+    """
+    Time-sorted OHLCV bars stored as contiguous NumPy columns.
+
+    Timestamps are int64 epoch seconds (UTC); prices, volume and the
+    volume-weighted average are float64; bar counts are int64. Instances are
+    immutable and the arrays may be views into larger buffers (for example
+    memory-mapped files), so operations return new series instead of
+    modifying columns in place.
+
+    Attributes:
+        timestamp (np.ndarray): Bar start times in epoch seconds.
+        open, high, low, close, volume, average (np.ndarray): Bar values.
+        bar_count (np.ndarray): Number of trades aggregated in each bar.
+        daily (bool): True when bars are dated (daily or longer bar sizes) and
+            should be serialized as dates instead of datetimes.
+    """
+
+    timestamp: npt.NDArray[np.int64]
+    open: npt.NDArray[np.float64]
+    high: npt.NDArray[np.float64]
+    low: npt.NDArray[np.float64]
+    close: npt.NDArray[np.float64]
+    volume: npt.NDArray[np.float64]
+    average: npt.NDArray[np.float64]
+    bar_count: npt.NDArray[np.int64]
+    daily: bool = False
+
+    @classmethod
+    def empty(cls, daily: bool = False) -> "BarSeries":
+        """Return a series without any bars."""
+        return cls.from_columns({}, daily=daily)
+
+    @classmethod
+    def from_columns(
+        cls, columns: Dict[str, Sequence[Any]], daily: bool = False
+    ) -> "BarSeries":
+        """
+        Build a series from a mapping of column name to values.
+
+        Missing columns are filled with zeros. Values are not copied when they
+        already are arrays of the right dtype.
+
+        Args:
+            columns (Dict[str, Sequence[Any]]): Column data keyed by name.
+            daily (bool): Whether the bars are dated rather than timed.
+
+        Returns:
+            BarSeries: The new series.
+        """
+        length = len(next(iter(columns.values()))) if columns else 0
+
+        def column(name: str, dtype: type) -> Any:
+            values = columns.get(name)
+            if values is None:
+                return np.zeros(length, dtype=dtype)
+            return np.asarray(values, dtype=dtype)
+
+        return cls(
+            timestamp=column("timestamp", np.int64),
+            open=column("open", np.float64),
+            high=column("high", np.float64),
+            low=column("low", np.float64),
+            close=column("close", np.float64),
+            volume=column("volume", np.float64),
+            average=column("average", np.float64),
+            bar_count=column("bar_count", np.int64),
+            daily=daily,
+        )
+
+    @classmethod
+    def from_bars(cls, bars: Iterable[Any]) -> "BarSeries":
+        """
+        Convert ib_insync ``BarData`` objects into a series in a single pass.
+
+        Args:
+            bars (Iterable[Any]): Bars as returned by ``reqHistoricalDataAsync``.
+
+        Returns:
+            BarSeries: The converted series.
+        """
+        bars = list(bars)
+        n = len(bars)
+        timestamp = np.empty(n, dtype=np.int64)
+        prices = np.empty((len(PRICE_COLUMNS), n), dtype=np.float64)
+        bar_count = np.empty(n, dtype=np.int64)
+        daily = bool(n) and not isinstance(bars[0].date, dt.datetime)
+
+        for i, bar in enumerate(bars):
+            timestamp[i] = _to_epoch(bar.date)
+            prices[:, i] = (
+                bar.open,
+                bar.high,
+                bar.low,
+                bar.close,
+                bar.volume,
+                bar.average,
+            )
+            bar_count[i] = bar.barCount
+
+        columns: Dict[str, Any] = dict(zip(PRICE_COLUMNS, prices))
+        return cls(timestamp=timestamp, bar_count=bar_count, daily=daily, **columns)
+
+    def __len__(self) -> int:
+        return int(self.timestamp.shape[0])
+
+    @property
+    def nbytes(self) -> int:
+        """Total size in bytes of all columns."""
+        return sum(self.column(name).nbytes for name in COLUMNS)
+
+    def column(self, name: str) -> npt.NDArray[Any]:
+        """Return the column array called ``name``."""
+        if name not in COLUMNS:
+            raise KeyError(f"Unknown bar column '{name}'")
+        values: npt.NDArray[Any] = getattr(self, name)
+        return values
+
+    def take(self, index: Any) -> "BarSeries":
+        """
+        Return a new series selecting rows by slice, mask or integer index.
+
+        Slices produce views; masks and index arrays produce copies.
+        """
+        columns = {name: self.column(name)[index] for name in COLUMNS}
+        return BarSeries(daily=self.daily, **columns)
+
+    def between(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> "BarSeries":
+        """
+        Return the bars with ``start <= timestamp < end`` as a zero-copy view.
+
+        Args:
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+
+        Returns:
+            BarSeries: A view on the selected range.
+        """
+        lo = 0 if start is None else int(np.searchsorted(self.timestamp, start, "left"))
+        hi = (
+            len(self)
+            if end is None
+            else int(np.searchsorted(self.timestamp, end, "left"))
+        )
+        return self.take(slice(lo, hi))
+
+    @staticmethod
+    def concat(series: Sequence["BarSeries"]) -> "BarSeries":
+        """
+        Concatenate series into one, resolving overlapping timestamps.
+
+        Inputs are merged in order and where two series contain the same
+        timestamp the bar from the later series wins, so appending a freshly
+        fetched tail replaces a previously incomplete last bar.
+
+        Args:
+            series (Sequence[BarSeries]): Series to merge.
+
+        Returns:
+            BarSeries: A time-sorted series with unique timestamps.
+        """
+        if not series:
+            return BarSeries.empty()
+        if len(series) == 1:
+            return series[0]
+
+        merged = {
+            name: np.concatenate([s.column(name) for s in series]) for name in COLUMNS
+        }
+        # Stable sort keeps input order among equal timestamps; keep the last one
+        order = np.argsort(merged["timestamp"], kind="stable")
+        timestamp = merged["timestamp"][order]
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = timestamp[:-1] != timestamp[1:]
+        selection = order[keep]
+
+        columns = {name: merged[name][selection] for name in COLUMNS}
+        return BarSeries(daily=series[0].daily, **columns)
+
+    def resample(self, seconds: int) -> "BarSeries":
+        """
+        Aggregate bars into buckets of ``seconds`` aligned to the epoch.
+
+        Open is the first open, close the last close, high/low the extrema,
+        volume and bar counts are summed and the average is volume-weighted.
+
+        Args:
+            seconds (int): Bucket width in seconds; must be positive.
+
+        Returns:
+            BarSeries: The aggregated series.
+        """
+        if seconds <= 0:
+            raise ValueError(f"Resample width must be positive, got {seconds}")
+        if not len(self):
+            return self
+
+        bucket = self.timestamp - self.timestamp % seconds
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        ends = np.r_[starts[1:], len(self)] - 1
+
+        volume = np.add.reduceat(self.volume, starts)
+        weighted = np.add.reduceat(self.average * self.volume, starts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average = np.where(
+                volume > 0,
+                weighted / volume,
+                np.add.reduceat(self.average, starts)
+                / np.diff(np.r_[starts, len(self)]),
+            )
+
+        return BarSeries(
+            timestamp=bucket[starts],
+            open=self.open[starts],
+            high=np.maximum.reduceat(self.high, starts),
+            low=np.minimum.reduceat(self.low, starts),
+            close=self.close[ends],
+            volume=volume,
+            average=average,
+            bar_count=np.add.reduceat(self.bar_count, starts),
+            daily=self.daily or seconds % 86400 == 0,
+        )
+
+    def dates(self, tz: Optional[dt.tzinfo] = dt.timezone.utc) -> npt.NDArray[np.str_]:
+        """
+        Format timestamps as ISO-8601 strings.
+
+        Daily series produce ``YYYY-MM-DD``. Intraday series produce UTC
+        datetimes such as ``2024-07-10T13:30:00Z`` by default; with another
+        ``tz`` (None for the system timezone) they produce wall-clock times
+        in that zone with their UTC offset, such as
+        ``2024-07-10T09:30:00-04:00``, the way timezone-aware TWS bar dates
+        used to be serialized.
+        """
+        if self.daily:
+            values = self.timestamp.astype("datetime64[s]").astype("datetime64[D]")
+            return np.datetime_as_string(values)
+        if tz is dt.timezone.utc:
+            values = self.timestamp.astype("datetime64[s]")
+            return np.datetime_as_string(values, timezone="UTC")
+        offsets = _utc_offsets(self.timestamp, tz)
+        local = np.datetime_as_string(
+            (self.timestamp + offsets).astype("datetime64[s]")
+        )
+        return np.char.add(local, _offset_suffixes(offsets))
+
+    def to_json(
+        self, format: str = "records", tz: Optional[dt.tzinfo] = dt.timezone.utc
+    ) -> bytes:
+        """
+        Serialize to JSON directly from the column arrays.
+
+        ``columns`` maps each column name to an array, with epoch-second
+        timestamps. ``records`` is a list of objects keyed like ib_insync
+        ``BarData``, so responses stay compatible with clients that consumed
+        ``bar.__dict__``; dates are formatted as by :meth:`dates` with ``tz``.
+        Neither layout creates Python objects per bar or per value, and
+        non-finite numbers are encoded as null.
+
+        Args:
+            format (str): "records" or "columns".
+            tz (Optional[dt.tzinfo]): Timezone of record dates.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON document.
+        """
+        if format == "columns":
+            return orjson.dumps(
+                {name: np.ascontiguousarray(self.column(name)) for name in COLUMNS},
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            )
+        if not len(self):
+            return b"[]"
+
+        fields = [
+            ("open", self.open),
+            ("high", self.high),
+            ("low", self.low),
+            ("close", self.close),
+            ("volume", self.volume),
+            ("average", self.average),
+            ("barCount", self.bar_count),
+        ]
+        rows = np.char.add('{"date":"', self.dates(tz))
+        separator = '"'
+        for key, values in fields:
+            rows = np.char.add(
+                np.char.add(rows, f'{separator},"{key}":'), _json_text(values)
+            )
+            separator = ""
+        rows = np.char.add(rows, "}")
+        return ("[" + ",".join(rows.tolist()) + "]").encode()
+
+
+def _json_text(values: npt.NDArray[Any]) -> npt.NDArray[np.str_]:
+    """Format numbers as JSON literals in one vectorized pass."""
+    text = values.astype(str)
+    if values.dtype.kind == "f":
+        text[~np.isfinite(values)] = "null"
+    return text
+
+
+def _offset_suffixes(offsets: npt.NDArray[np.int64]) -> npt.NDArray[np.str_]:
+    """Format UTC offsets in seconds as ISO-8601 suffixes such as ``-04:00``."""
+    unique, inverse = np.unique(offsets, return_inverse=True)
+    labels = []
+    for offset in unique.tolist():
+        sign = "-" if offset < 0 else "+"
+        hours, minutes = divmod(abs(offset) // 60, 60)
+        labels.append(f"{sign}{hours:02d}:{minutes:02d}")
+    return np.array(labels, dtype=np.str_)[inverse.reshape(offsets.shape)]
+
+
+def _utc_offsets(
+    timestamps: npt.NDArray[np.int64], tz: Optional[dt.tzinfo]
+) -> npt.NDArray[np.int64]:
+    """
+    Return the UTC offset in seconds of ``tz`` (None for the system
+    timezone) at each timestamp.
+
+    Offsets only change at half-hour boundaries, so they are computed once
+    per distinct half hour rather than per timestamp.
+    """
+    buckets, inverse = np.unique(timestamps // 1800, return_inverse=True)
+    offsets = np.empty(len(buckets), dtype=np.int64)
+    for i, bucket in enumerate(buckets.tolist()):
+        moment = dt.datetime.fromtimestamp(bucket * 1800, dt.timezone.utc)
+        offset = moment.astimezone(tz).utcoffset()
+        offsets[i] = int(offset.total_seconds()) if offset is not None else 0
+    return offsets[inverse.reshape(timestamps.shape)]
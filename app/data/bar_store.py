@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from app.data.bar_series import COLUMNS, BarSeries
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+_META_FILE = "meta.json"
+_INDEX_FILE = "index.bin"
+_DTYPES: Dict[str, Any] = {
+    name: np.int64 if name in ("timestamp", "bar_count") else np.float64
+    for name in COLUMNS
+}
+
+_BAR_UNITS = {
+    "sec": 1,
+    "secs": 1,
+    "min": 60,
+    "mins": 60,
+    "hour": 3600,
+    "hours": 3600,
+    "day": 86400,
+    "days": 86400,
+    "week": 7 * 86400,
+    "weeks": 7 * 86400,
+    "month": 31 * 86400,
+    "months": 31 * 86400,
+}
+
+
+def bar_size_seconds(bar_size: str) -> int:
+    """
+    Convert an IB bar size setting (e.g. '5 mins', '1 day') into seconds.
+
+    Months are counted as 31 days, an upper bound used to decide whether a
+    bar is complete.
+
+    Args:
+        bar_size (str): IB bar size setting.
+
+    Returns:
+        int: Bar length in seconds.
+
+    Raises:
+        ValueError: If the bar size cannot be parsed.
+    """
+    match = re.fullmatch(r"\s*(\d+)\s+([a-zA-Z]+)\s*", bar_size)
+    if not match or match.group(2).lower() not in _BAR_UNITS:
+        raise ValueError(f"Invalid bar size '{bar_size}'")
+    return int(match.group(1)) * _BAR_UNITS[match.group(2).lower()]
+
+
+class BarKey(NamedTuple):
+    """Identifies one stored series."""
+
+    contract: str
+    bar_size: str
+    what_to_show: str
+    use_rth: bool
+
+    def relative_path(self) -> Path:
+        """Directory of the series relative to the store root."""
+        return (
+            Path(re.sub(r"[^\w.-]", "_", self.contract))
+            / self.bar_size.strip().replace(" ", "_")
+            / f"{self.what_to_show.upper()}_{'rth' if self.use_rth else 'all'}"
+        )
+
+
+class BarStore:
+    """
+    Append-only, memory-mapped storage of historical bars.
+
+    Each series is a directory with one fixed-width binary file per column,
+    a sparse index holding every ``index_stride``-th timestamp, and a
+    ``meta.json`` file recording the committed row count and the time ranges
+    known to be covered. Writers append
+    column data first and publish the new length last with an atomic file
+    replace, so readers only ever map rows that are fully written. Reads
+    map the files read-only and return views, making range queries
+    independent of the total file size.
+
+    A single writer per series is assumed; appends within this process are
+    serialized with a per-series lock.
+    """
+
+    def __init__(self, root: Union[str, Path], index_stride: int = 1024) -> None:
+        """
+        Initialize the store.
+
+        Args:
+            root (Union[str, Path]): Directory holding all series.
+            index_stride (int): Rows between consecutive sparse index entries.
+        """
+        if index_stride <= 0:
+            raise ValueError(f"Index stride must be positive, got {index_stride}")
+        self.root = Path(root)
+        self.index_stride = index_stride
+        self._locks: Dict[BarKey, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, key: BarKey) -> Path:
+        return self.root / key.relative_path()
+
+    def _lock(self, key: BarKey) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _read_meta(path: Path) -> Dict[str, Any]:
+        try:
+            with (path / _META_FILE).open("r", encoding="utf-8") as f:
+                meta: Dict[str, Any] = json.load(f)
+                return meta
+        except FileNotFoundError:
+            return {"length": 0, "daily": False}
+
+    @staticmethod
+    def _write_meta(path: Path, meta: Dict[str, Any]) -> None:
+        tmp = path / f"{_META_FILE}.tmp"
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump(meta, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path / _META_FILE)
+
+    @staticmethod
+    def _write_at(file: Path, offset: int, values: npt.NDArray[Any]) -> None:
+        # Write at the committed offset rather than appending, which also
+        # overwrites any bytes left behind by an interrupted earlier append.
+        with file.open("r+b" if file.exists() else "wb") as f:
+            f.seek(offset)
+            f.write(values.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    def length(self, key: BarKey) -> int:
+        """Return the number of committed bars for ``key``."""
+        return int(self._read_meta(self._path(key))["length"])
+
+    def coverage(self, key: BarKey) -> List[Tuple[int, int]]:
+        """
+        Return the ``[start, end)`` epoch-second ranges known to be covered.
+
+        Bars are stored across gaps (such as between two trading sessions
+        fetched separately), so only these ranges are known to be complete;
+        between them data was never fetched.
+        """
+        path = self._path(key)
+        meta = self._read_meta(path)
+        return [(int(lo), int(hi)) for lo, hi in self._ranges(path, meta, key)]
+
+    def _ranges(self, path: Path, meta: Dict[str, Any], key: BarKey) -> List[List[int]]:
+        if "ranges" in meta:
+            return [list(r) for r in meta["ranges"]]
+        length = int(meta["length"])
+        if not length:
+            return []
+        # Written before ranges were recorded: everything was contiguous
+        timestamps = self._map(path, "timestamp", length)
+        return [
+            [int(timestamps[0]), int(timestamps[-1]) + bar_size_seconds(key.bar_size)]
+        ]
+
+    def append(
+        self, key: BarKey, series: BarSeries, now: Optional[float] = None
+    ) -> int:
+        """
+        Append the bars of ``series`` that are newer than the stored tail.
+
+        Only complete bars are stored (bars whose end lies before ``now``).
+        A series that starts after the stored tail, such as the next trading
+        session, is appended as well; the span it covers is recorded as a
+        new range, so the gap before it stays visible in :meth:`coverage`.
+
+        Args:
+            key (BarKey): Series to append to.
+            series (BarSeries): Time-sorted bars to append.
+            now (Optional[float]): Current epoch time; defaults to ``time.time()``.
+
+        Returns:
+            int: Number of bars appended.
+        """
+        now = time.time() if now is None else now
+        complete_before = int(now) - bar_size_seconds(key.bar_size)
+        series = series.between(end=complete_before + 1)
+        if not len(series):
+            return 0
+
+        path = self._path(key)
+        with self._lock(key):
+            meta = self._read_meta(path)
+            length = int(meta["length"])
+            stride = int(meta.get("stride", self.index_stride))
+
+            ranges = self._ranges(path, meta, key)
+            # A fetch reaching back into covered time extends that range
+            fetched_from = int(series.timestamp[0])
+            if length:
+                last = int(self._map(path, "timestamp", length)[-1])
+                series = series.between(start=last + 1)
+                if not len(series):
+                    return 0
+            else:
+                path.mkdir(parents=True, exist_ok=True)
+
+            end = int(series.timestamp[-1]) + bar_size_seconds(key.bar_size)
+            if ranges and fetched_from <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], end)
+            else:
+                if ranges:
+                    logger.debug(f"Appending to {key} after a gap at {ranges[-1][1]}")
+                ranges.append([fetched_from, end])
+
+            for name in COLUMNS:
+                dtype = np.dtype(_DTYPES[name])
+                values = np.ascontiguousarray(series.column(name), dtype=dtype)
+                self._write_at(path / f"{name}.bin", length * dtype.itemsize, values)
+
+            new_length = length + len(series)
+            first_entry = -(-length // stride)
+            rows = np.arange(first_entry * stride, new_length, stride)
+            if len(rows):
+                entries = series.timestamp[rows - length].astype(np.int64)
+                self._write_at(path / _INDEX_FILE, first_entry * 8, entries)
+
+            self._write_meta(
+                path,
+                {
+                    "length": new_length,
+                    "daily": series.daily,
+                    "stride": stride,
+                    "ranges": ranges,
+                },
+            )
+
+        logger.debug(f"Appended {len(series)} bars to {key}")
+        return len(series)
+
+    @staticmethod
+    def _map(path: Path, name: str, length: int) -> npt.NDArray[Any]:
+        return np.memmap(
+            path / f"{name}.bin", dtype=_DTYPES[name], mode="r", shape=(length,)
+        )
+
+    def read_range(
+        self, key: BarKey, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Optional[BarSeries]:
+        """
+        Return stored bars with ``start <= timestamp < end`` without copying.
+
+        The sparse index narrows the search to one stride of rows on each
+        side, and the returned columns are views into the mapped files.
+
+        Args:
+            key (BarKey): Series to read.
+            start (Optional[int]): Inclusive lower bound in epoch seconds.
+            end (Optional[int]): Exclusive upper bound in epoch seconds.
+
+        Returns:
+            Optional[BarSeries]: The selected bars, or None if nothing is stored.
+        """
+        path = self._path(key)
+        meta = self._read_meta(path)
+        length = int(meta["length"])
+        if not length:
+            return None
+
+        stride = int(meta.get("stride", self.index_stride))
+        index = np.fromfile(
+            path / _INDEX_FILE, dtype=np.int64, count=-(-length // stride)
+        )
+        timestamps = self._map(path, "timestamp", length)
+
+        def locate(value: Optional[int], default: int) -> int:
+            if value is None:
+                return default
+            block = max(int(np.searchsorted(index, value, "right")) - 1, 0)
+            lo = block * stride
+            hi = min(lo + stride, length)
+            return lo + int(np.searchsorted(timestamps[lo:hi], value, "left"))
+
+        lo = locate(start, 0)
+        hi = max(locate(end, length), lo)
+
+        columns = {
+            name: self._map(path, name, length)[lo:hi]
+            if name != "timestamp"
+            else timestamps[lo:hi]
+            for name in COLUMNS
+        }
+        return BarSeries(daily=bool(meta.get("daily", False)), **columns)
+
+
+@lru_cache()
+def get_bar_store() -> Optional[BarStore]:
+    """
+    Return the shared BarStore, or None when storage is disabled in settings.
+    """
+    storage = get_settings().storage
+    if not storage.enabled:
+        return None
+    return BarStore(storage.path, index_stride=storage.index_stride)
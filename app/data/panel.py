@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from functools import reduce
+from typing import Mapping, Tuple
+
+import numpy as np
+import numpy.typing as npt
+import orjson
+
+from app.data.bar_series import COLUMNS, BarSeries
+
+
+@dataclass(frozen=True, eq=False)
+class Panel:
+    """
+    One field of several bar series aligned on a common timestamp grid.
+
+    ``values`` is a dense float64 matrix with one row per grid timestamp and
+    one column per label; cells without a bar are NaN.
+
+    Attributes:
+        labels (Tuple[str, ...]): Column labels, e.g. symbols.
+        timestamp (np.ndarray): Sorted grid of epoch seconds.
+        values (np.ndarray): Matrix of shape ``(len(timestamp), len(labels))``.
+        field (str): Bar column the values were taken from.
+    """
+
+    labels: Tuple[str, ...]
+    timestamp: npt.NDArray[np.int64]
+    values: npt.NDArray[np.float64]
+    field: str
+
+    @classmethod
+    def align(
+        cls,
+        series: Mapping[str, BarSeries],
+        field: str = "close",
+        how: str = "outer",
+        ffill: bool = False,
+    ) -> "Panel":
+        """
+        Join one column of several series on their timestamps.
+
+        The grid is the union (``outer``) or intersection (``inner``) of all
+        timestamps. Each series is placed on it with a single binary search,
+        so the join is vectorized regardless of the number of bars.
+
+        Args:
+            series (Mapping[str, BarSeries]): Series by label, in column order.
+            field (str): Column to take from each series, e.g. "close".
+            how (str): "outer" or "inner".
+            ffill (bool): Fill gaps with the latest earlier value of the same
+                series; cells before its first bar stay NaN.
+
+        Returns:
+            Panel: The aligned panel.
+
+        Raises:
+            ValueError: If ``how`` or ``field`` is invalid.
+        """
+        if field not in COLUMNS or field == "timestamp":
+            raise ValueError(f"Invalid field {field!r}")
+        if how not in ("outer", "inner"):
+            raise ValueError(f"Invalid join {how!r}; expected 'outer' or 'inner'")
+
+        stamps = [s.timestamp for s in series.values()]
+        if not stamps:
+            grid = np.empty(0, dtype=np.int64)
+        else:
+            join = np.union1d if how == "outer" else np.intersect1d
+            grid = reduce(join, stamps).astype(np.int64, copy=False)
+
+        values = np.full((len(grid), len(stamps)), np.nan, dtype=np.float64)
+        for col, s in enumerate(series.values()):
+            if not len(s):
+                continue
+            # Index of the last bar at or before each grid timestamp
+            index = np.searchsorted(s.timestamp, grid, side="right") - 1
+            found = index >= 0
+            if not ffill:
+                found &= s.timestamp[np.maximum(index, 0)] == grid
+            values[found, col] = s.column(field)[index[found]]
+
+        return cls(labels=tuple(series), timestamp=grid, values=values, field=field)
+
+    def __len__(self) -> int:
+        return len(self.timestamp)
+
+    def to_json(self) -> bytes:
+        """
+        Serialize to a column-oriented JSON document directly from the
+        arrays: the field, the timestamp grid and one array per label.
+        Missing (NaN) cells are encoded as null.
+
+        Returns:
+            bytes: The UTF-8 encoded JSON document.
+        """
+        # One contiguous row per label, so each column serializes as is
+        columns = np.ascontiguousarray(self.values.T)
+        return orjson.dumps(
+            {
+                "field": self.field,
+                "timestamp": self.timestamp,
+                "columns": dict(zip(self.labels, columns)),
+            },
+            option=orjson.OPT_SERIALIZE_NUMPY,
+        )
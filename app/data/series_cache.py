@@ -0,0 +1,231 @@
+import asyncio
+import base64
+import json
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, NamedTuple, Optional
+
+from ib_insync import Contract
+
+from app.data.bar_series import BarSeries
+from app.data.bar_store import BarKey, bar_size_seconds
+from app.settings import get_settings
+
+# IB accepts durations in seconds up to one day; longer tails use days
+_MAX_SECONDS_DURATION = 86400
+
+
+class CachedSeries(NamedTuple):
+    """
+    A cached series, when it was last refreshed from IB and the resolved
+    contract to fetch its tail with.
+    """
+
+    series: BarSeries
+    refreshed_at: float
+    contract: Optional[Contract] = None
+
+
+class SeriesCache:
+    """
+    Keep recently requested bar series in memory for incremental polling.
+
+    Clients that poll a series only need the bars added since their last
+    request; the cache holds the series so each poll fetches just the
+    missing tail from IB and merges it in. Entries are evicted least
+    recently used first, and each is trimmed to its newest ``max_bars``.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        max_bars: int = 100_000,
+        min_refresh: float = 1.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Args:
+            max_entries (int): Series kept before evicting the least recent.
+            max_bars (int): Bars kept per series.
+            min_refresh (float): Seconds during which a refreshed series is
+                served without asking IB again.
+            clock (Callable[[], float]): Wall clock, injectable for tests.
+        """
+        self.max_entries = max_entries
+        self.max_bars = max_bars
+        self.min_refresh = min_refresh
+        self._clock = clock
+        self._entries: "OrderedDict[BarKey, CachedSeries]" = OrderedDict()
+        self._locks: Dict[BarKey, asyncio.Lock] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lock(self, key: BarKey) -> asyncio.Lock:
+        """
+        Lock serializing refreshes of one series, so concurrent polls share
+        a single IB request.
+        """
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+        return self._locks[key]
+
+    def get(self, key: BarKey) -> Optional[CachedSeries]:
+        """Return the cached series for ``key``, if any."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def is_fresh(self, entry: CachedSeries) -> bool:
+        """True while an entry was refreshed too recently to ask IB again."""
+        return self._clock() - entry.refreshed_at < self.min_refresh
+
+    def put(
+        self, key: BarKey, series: BarSeries, contract: Optional[Contract] = None
+    ) -> BarSeries:
+        """
+        Replace the cached series for ``key``.
+
+        Args:
+            key (BarKey): Series to replace.
+            series (BarSeries): Bars to cache.
+            contract (Optional[Contract]): Resolved contract of the series;
+                defaults to the one already cached.
+
+        Returns:
+            BarSeries: The series as cached, trimmed to ``max_bars``.
+        """
+        if contract is None and key in self._entries:
+            contract = self._entries[key].contract
+        if len(series) > self.max_bars:
+            series = series.take(slice(len(series) - self.max_bars, None))
+        self._entries[key] = CachedSeries(series, self._clock(), contract)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            lock = self._locks.get(evicted)
+            if lock is not None and not lock.locked():
+                del self._locks[evicted]
+        return series
+
+    def merge(
+        self, key: BarKey, tail: BarSeries, contract: Optional[Contract] = None
+    ) -> BarSeries:
+        """
+        Merge newly fetched bars into the cached series for ``key``.
+
+        Fetched bars replace cached bars with the same timestamp, which
+        updates the previously incomplete last bar. Bars starting after the
+        cached series ends replace it, since the bars in between are unknown.
+
+        Returns:
+            BarSeries: The merged series as cached.
+        """
+        entry = self._entries.get(key)
+        if (
+            entry is None
+            or not len(entry.series)
+            or (len(tail) and tail.timestamp[0] > entry.series.timestamp[-1])
+        ):
+            return self.put(key, tail, contract)
+        return self.put(key, BarSeries.concat([entry.series, tail]), contract)
+
+    def covers(self, entry: CachedSeries, start: int) -> bool:
+        """
+        True if ``entry`` holds every bar from ``start`` on: its series
+        begins at or before ``start``.
+        """
+        return len(entry.series) > 0 and int(entry.series.timestamp[0]) <= start
+
+    def tail_duration(self, series: BarSeries, bar_size: str) -> str:
+        """
+        Return the IB duration string covering everything after the start of
+        the last cached bar, which may still have been incomplete.
+
+        Raises:
+            ValueError: If the series is empty or the bar size is invalid.
+        """
+        if not len(series):
+            raise ValueError("An empty series has no tail")
+        return duration_since(int(series.timestamp[-1]), self._clock(), bar_size)
+
+    def next_cursor(self, key: BarKey, series: BarSeries, bar_size: str) -> str:
+        """
+        Return the cursor to resume polling after ``series``.
+
+        The cursor points at the last bar while it may still be incomplete,
+        so the next poll returns its final values, and past it otherwise.
+        """
+        if not len(series):
+            return encode_cursor(key, 0)
+        last = int(series.timestamp[-1])
+        try:
+            complete = last + bar_size_seconds(bar_size) <= self._clock()
+        except ValueError:
+            complete = False
+        return encode_cursor(key, last + 1 if complete else last)
+
+
+def duration_since(start: int, now: float, bar_size: str) -> str:
+    """
+    Return the IB duration string reaching from ``now`` back to the bar
+    that contains ``start``.
+
+    Raises:
+        ValueError: If the bar size is invalid.
+    """
+    bar_seconds = bar_size_seconds(bar_size)
+    seconds = max(0, math.ceil(now - start)) + bar_seconds
+    if bar_seconds < 86400 and seconds <= _MAX_SECONDS_DURATION:
+        return f"{seconds} S"
+    days = math.ceil(seconds / 86400)
+    # IB rejects day durations above 365; longer spans must use years
+    return f"{days} D" if days <= 365 else f"{math.ceil(days / 365)} Y"
+
+
+def encode_cursor(key: BarKey, timestamp: int) -> str:
+    """
+    Encode an opaque polling cursor: the series it belongs to and the
+    inclusive epoch-second timestamp to resume from.
+    """
+    payload = json.dumps({"k": list(key), "t": timestamp}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, key: BarKey) -> int:
+    """
+    Decode a cursor issued by :func:`encode_cursor` for the series ``key``.
+
+    Returns:
+        int: The inclusive epoch-second timestamp to resume from.
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another series.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_key, timestamp = BarKey(*payload["k"]), int(payload["t"])
+    except (ValueError, TypeError, KeyError) as exc:
+        raise ValueError("Malformed cursor") from exc
+    if cursor_key != key:
+        raise ValueError("Cursor belongs to a different series")
+    return timestamp
+
+
+@lru_cache()
+def get_series_cache() -> Optional[SeriesCache]:
+    """
+    Return the shared series cache, or None when it is disabled in settings.
+    """
+    config = get_settings().series_cache
+    if not config.enabled:
+        return None
+    return SeriesCache(
+        max_entries=config.max_entries,
+        max_bars=config.max_bars,
+        min_refresh=config.min_refresh,
+    )
@@ -1,5 +1,14 @@
+from .errors import CircuitOpenError, IBError
 from .ib_client_manager import IBClientManager
+from .pacing import PacingBudget
+from .resilience import CircuitBreaker, Deadline, call_with_retries
 
 __all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "Deadline",
     "IBClientManager",
+    "IBError",
+    "PacingBudget",
+    "call_with_retries",
 ]
@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, Query
+from ib_insync import Contract
+
+# Security types whose contracts are unique given these non-empty fields,
+# in addition to symbol and currency. Exchange must name a real venue
+# (not SMART) where listed.
+_REQUIRED_FIELDS = {
+    "STK": ("primary_exchange",),
+    "CASH": ("exchange",),
+    "CRYPTO": ("exchange",),
+    "IND": ("exchange",),
+    "FUT": ("exchange", "last_trade_date_or_contract_month"),
+    "CONTFUT": ("exchange",),
+    "OPT": ("exchange", "last_trade_date_or_contract_month", "strike", "right"),
+    "FOP": ("exchange", "last_trade_date_or_contract_month", "strike", "right"),
+}
+_SMART_ALLOWED = {"STK", "OPT"}
+_VENUE_FIELDS = ("exchange", "primary_exchange")
+
+
+@dataclass(frozen=True)
+class ContractSpec:
+    """
+    Contract fields accepted by the API, mirroring ib_insync's ``Contract``.
+    """
+
+    symbol: Optional[str] = None
+    con_id: Optional[int] = None
+    sec_type: str = "STK"
+    exchange: str = "SMART"
+    primary_exchange: str = ""
+    currency: str = "USD"
+    last_trade_date_or_contract_month: str = ""
+    strike: Optional[float] = None
+    right: str = ""
+    multiplier: str = ""
+    local_symbol: str = ""
+    trading_class: str = ""
+
+    def describe(self) -> str:
+        """Short human readable identification used in messages."""
+        if self.con_id:
+            return f"conId {self.con_id}"
+        if self.local_symbol:
+            return f"local symbol '{self.local_symbol}'"
+        return f"symbol '{self.symbol}'"
+
+    @property
+    def is_fully_specified(self) -> bool:
+        """
+        True when the spec identifies exactly one contract, so historical
+        data can be requested without a contract details lookup.
+        """
+        if self.con_id:
+            return True
+        sec_type = self.sec_type.upper()
+        if not (self.symbol or self.local_symbol) or not self.currency:
+            return False
+        if sec_type not in _REQUIRED_FIELDS:
+            return False
+        if self.exchange.upper() == "SMART" and sec_type not in _SMART_ALLOWED:
+            return False
+        required = _REQUIRED_FIELDS[sec_type]
+        if self.local_symbol:
+            # The local symbol encodes expiry, strike and right, not the venue
+            required = tuple(name for name in required if name in _VENUE_FIELDS)
+        return all(getattr(self, name) not in (None, "") for name in required)
+
+    def to_contract(self) -> Contract:
+        """Build the ib_insync contract described by this spec."""
+        if self.con_id:
+            # conId alone identifies the contract; IB only needs a routing exchange
+            return Contract(conId=self.con_id, exchange=self.exchange)
+        return Contract(
+            symbol=self.symbol or "",
+            secType=self.sec_type.upper(),
+            exchange=self.exchange,
+            primaryExchange=self.primary_exchange,
+            currency=self.currency,
+            lastTradeDateOrContractMonth=self.last_trade_date_or_contract_month,
+            strike=self.strike or 0.0,
+            right=self.right,
+            multiplier=self.multiplier,
+            localSymbol=self.local_symbol,
+            tradingClass=self.trading_class,
+        )
+
+
+def contract_key(contract: Contract) -> str:
+    """
+    Return a stable identifier for a contract, used to key in-memory caches.
+
+    The conId is used when known; otherwise the identifying fields are joined.
+    The bar store is keyed by conId alone, so field-joined keys never name
+    stored series.
+    """
+    if contract.conId:
+        return str(contract.conId)
+    fields = (
+        contract.localSymbol or contract.symbol,
+        contract.secType,
+        contract.exchange,
+        contract.primaryExchange,
+        contract.currency,
+        contract.lastTradeDateOrContractMonth,
+        f"{contract.strike:g}" if contract.strike else "",
+        contract.right,
+        contract.multiplier,
+    )
+    return "-".join(field for field in fields if field)
+
+
+def contract_spec(
+    symbol: Optional[str] = Query(None, description="The symbol to fetch data for"),
+    con_id: Optional[int] = Query(
+        None,
+        description="IB contract id. When given, no contract lookup is needed.",
+    ),
+    sec_type: str = Query(
+        "STK",
+        description="Security type (e.g. STK, CASH, FUT, OPT, FOP, IND, CRYPTO)",
+    ),
+    exchange: str = Query("SMART", description="Destination exchange"),
+    primary_exchange: str = Query(
+        "", description="Primary listing exchange, to disambiguate SMART stocks"
+    ),
+    currency: str = Query("USD", description="Contract currency"),
+    last_trade_date_or_contract_month: str = Query(
+        "", description="Expiry as YYYYMM or YYYYMMDD for derivatives"
+    ),
+    strike: Optional[float] = Query(None, description="Option strike price"),
+    right: str = Query("", description="Option right: C or P"),
+    multiplier: str = Query("", description="Contract multiplier"),
+    local_symbol: str = Query("", description="Exchange-local symbol"),
+    trading_class: str = Query("", description="Trading class"),
+) -> ContractSpec:
+    """
+    FastAPI dependency collecting the contract query parameters.
+
+    Raises:
+        HTTPException: 422 if none of symbol, con_id or local_symbol is given.
+    """
+    if not (symbol or con_id or local_symbol):
+        raise HTTPException(
+            status_code=422,
+            detail="One of 'symbol', 'con_id' or 'local_symbol' is required",
+        )
+    return ContractSpec(
+        symbol=symbol,
+        con_id=con_id,
+        sec_type=sec_type,
+        exchange=exchange,
+        primary_exchange=primary_exchange,
+        currency=currency,
+        last_trade_date_or_contract_month=last_trade_date_or_contract_month,
+        strike=strike,
+        right=right,
+        multiplier=multiplier,
+        local_symbol=local_symbol,
+        trading_class=trading_class,
+    )
@@ -0,0 +1,108 @@
+import asyncio
+from typing import Dict, Optional
+
+from ib_insync import RequestError
+
+# IB error codes mapped to the HTTP status reported to clients.
+# See https://interactivebrokers.github.io/tws-api/message_codes.html
+_STATUS_BY_CODE: Dict[int, int] = {
+    162: 502,  # Historical market data service error (refined by message)
+    200: 404,  # No security definition has been found for the request
+    203: 403,  # The security is not available or allowed for this account
+    321: 400,  # Error validating request
+    354: 403,  # Requested market data is not subscribed
+    366: 502,  # No historical data query found for ticker id
+    502: 503,  # Couldn't connect to TWS
+    504: 503,  # Not connected
+    1100: 503,  # Connectivity between IB and TWS has been lost
+    2110: 503,  # Connectivity between TWS and server is broken
+    10089: 403,  # Requested market data requires additional subscription
+    10090: 403,  # Part of requested market data is not subscribed
+}
+
+# Codes caused by an unhealthy gateway connection rather than by the request
+_TRANSIENT_CODES = {502, 504, 1100, 2110}
+
+
+class IBError(Exception):
+    """
+    An IB or gateway failure classified for reporting over HTTP.
+
+    Attributes:
+        status_code (int): HTTP status to respond with.
+        code (Optional[int]): Original IB error code, if any.
+        retryable (bool): Whether retrying the same call may succeed.
+        retry_after (Optional[float]): Seconds a client should wait, if known.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int = 502,
+        code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.code = code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+    @property
+    def no_data(self) -> bool:
+        """True when IB answered that the query matched no data."""
+        return self.code == 162 and "no data" in str(self).lower()
+
+    @property
+    def headers(self) -> Optional[Dict[str, str]]:
+        """HTTP headers to send along with the error response."""
+        if self.retry_after is None:
+            return None
+        return {"Retry-After": str(max(1, int(self.retry_after + 0.999)))}
+
+
+class CircuitOpenError(IBError):
+    """Raised without contacting IB while the circuit breaker is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(
+            "IB gateway is unavailable; failing fast while it recovers",
+            status_code=503,
+            retry_after=retry_after,
+        )
+
+
+def classify_error(exc: BaseException, phase: str) -> Optional[IBError]:
+    """
+    Convert an exception raised while talking to IB into an IBError.
+
+    Args:
+        exc (BaseException): The exception raised by ib_insync or asyncio.
+        phase (str): Human readable name of the failed step, used in messages.
+
+    Returns:
+        Optional[IBError]: The classified error, or None when the exception is
+        not an IB or connection failure.
+    """
+    if isinstance(exc, IBError):
+        return exc
+    if isinstance(exc, RequestError):
+        status_code = _STATUS_BY_CODE.get(exc.code, 502)
+        if exc.code == 162 and "pacing violation" in exc.message.lower():
+            status_code = 429
+        return IBError(
+            f"IB error {exc.code} during {phase}: {exc.message}",
+            status_code=status_code,
+            code=exc.code,
+            retryable=exc.code in _TRANSIENT_CODES,
+        )
+    if isinstance(exc, asyncio.TimeoutError):
+        return IBError(f"Timed out during {phase}", status_code=504, retryable=True)
+    if isinstance(exc, (ConnectionError, OSError)):
+        return IBError(
+            f"Connection to IB failed during {phase}: {exc}",
+            status_code=503,
+            retryable=True,
+        )
+    return None
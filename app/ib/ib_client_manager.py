@@ -5,6 +5,7 @@ from typing import Optional, Type
 
 from ib_insync import IB
 
+from app.ib.resilience import Deadline, call_with_retries
 from app.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -36,14 +37,20 @@ class IBClientManager:
         with IBClientManager() as ib:
             ib.positions()
 
+    Request errors reported by IB are raised as ``ib_insync.RequestError``
+    instead of producing empty results, so callers can classify them.
+
     Attributes:
         ib (IB): The managed ib_insync.IB instance.
+        deadline (Optional[Deadline]): Deadline bounding the connection attempt.
     """
 
     def __init__(
         self,
         host: Optional[str] = None,
         port: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        client_id: Optional[int] = None,
     ) -> None:
         """
         Initialize the client manager.
@@ -51,6 +58,10 @@ class IBClientManager:
         Args:
             host (Optional[str]): IB host. Defaults to settings.
             port (Optional[int]): IB port. Defaults to settings.
+            deadline (Optional[Deadline]): Request deadline to connect within.
+                Defaults to one created from the configured request timeout.
+            client_id (Optional[int]): IB client ID. Defaults to a generated
+                pseudo-unique one.
         """
         settings = get_settings()
 
@@ -65,8 +76,13 @@ class IBClientManager:
             self.port = 7497
             logger.warning("No IB port specified; using default 7497")
 
-        self.client_id = _generate_client_id()
+        self.connect_timeout = ib_config.connect_timeout
+        self.request_timeout = ib_config.request_timeout
+        self.deadline = deadline
+
+        self.client_id = _generate_client_id() if client_id is None else client_id
         self.ib = IB()  # type: ignore
+        self.ib.RaiseRequestErrors = True
 
         logger.info(
             f"IBClientManager initialized with host={self.host}, port={self.port}, client_id={self.client_id}"
@@ -76,13 +92,29 @@ class IBClientManager:
         """
         Asynchronously connect to the IB server and return the client.
 
+        Each attempt is bounded by the connect timeout and the time left on
+        the request deadline; transient failures are retried.
+
         Returns:
             IB: The connected IB client instance.
+
+        Raises:
+            IBError: If the connection fails, times out or the circuit is open.
         """
         logger.info(
             f"Connecting to IB server at {self.host}:{self.port} with client_id={self.client_id}"
         )
-        await self.ib.connectAsync(self.host, self.port, self.client_id)
+        deadline = self.deadline or Deadline(self.request_timeout)
+        await call_with_retries(
+            lambda: self.ib.connectAsync(
+                self.host,
+                self.port,
+                self.client_id,
+                timeout=deadline.timeout(self.connect_timeout),
+            ),
+            deadline=deadline,
+            phase="connect",
+        )
         logger.info("Connected to IB server")
         return self.ib
 
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import math
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from ib_insync import IB, AccountValue, Contract, PortfolioItem, Position, Trade, util
+
+from app.ib.ib_client_manager import IBClientManager
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _clean(value: Any) -> Any:
+    """Replace NaN/inf, which JSON cannot encode, with None."""
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _price(value: float) -> Optional[float]:
+    """Return an order price, or None when IB marks it as unset."""
+    return None if value == util.UNSET_DOUBLE else _clean(value)
+
+
+def contract_to_dict(contract: Contract) -> Dict[str, Any]:
+    """Serialize the fields of a contract that differ from their defaults."""
+    return {
+        name: _clean(value)
+        for name, value in util.dataclassNonDefaults(contract).items()
+        if not isinstance(value, (list, dict)) and value is not None
+    }
+
+
+def position_to_dict(position: Position) -> Dict[str, Any]:
+    """Serialize an ib_insync Position."""
+    return {
+        "account": position.account,
+        "contract": contract_to_dict(position.contract),
+        "position": _clean(position.position),
+        "avgCost": _clean(position.avgCost),
+    }
+
+
+def portfolio_item_to_dict(item: PortfolioItem) -> Dict[str, Any]:
+    """Serialize an ib_insync PortfolioItem."""
+    values = {name: _clean(value) for name, value in item._asdict().items()}
+    values["contract"] = contract_to_dict(item.contract)
+    return values
+
+
+def account_value_to_dict(value: AccountValue) -> Dict[str, Any]:
+    """Serialize an ib_insync AccountValue."""
+    return dict(value._asdict())
+
+
+def trade_to_dict(trade: Trade) -> Dict[str, Any]:
+    """Serialize the order and status of an ib_insync Trade."""
+    order = trade.order
+    status = trade.orderStatus
+    return {
+        "contract": contract_to_dict(trade.contract),
+        "order": {
+            "orderId": order.orderId,
+            "permId": order.permId,
+            "account": order.account,
+            "action": order.action,
+            "totalQuantity": _clean(order.totalQuantity),
+            "orderType": order.orderType,
+            "lmtPrice": _price(order.lmtPrice),
+            "auxPrice": _price(order.auxPrice),
+            "tif": order.tif,
+        },
+        "orderStatus": {
+            "status": status.status,
+            "filled": _clean(status.filled),
+            "remaining": _clean(status.remaining),
+            "avgFillPrice": _clean(status.avgFillPrice),
+        },
+    }
+
+
+def _live_manager() -> IBClientManager:
+    """
+    Create the client manager of the live connection.
+
+    It uses the configured ``live_client_id`` rather than a generated one:
+    client ID 0 (the default) is bound to orders placed manually in TWS, so
+    they are reported and kept in sync like the API's own orders.
+    """
+    return IBClientManager(client_id=get_settings().ib.live_client_id)
+
+
+@dataclass(eq=False)
+class Subscriber:
+    """
+    A change-feed consumer with a bounded queue of pending events.
+
+    When a slow consumer's queue is full the oldest event is dropped and
+    ``overflowed`` is set, telling the consumer to re-read a snapshot.
+    """
+
+    queue: "asyncio.Queue[Dict[str, Any]]"
+    overflowed: bool = False
+
+
+class LiveIBState:
+    """
+    A long-lived IB connection whose account state is kept in sync by events.
+
+    ib_insync keeps positions, portfolio, account values and open orders up
+    to date in memory once connected, so reads are answered without any IB
+    round trip. Changes are also fanned out to change-feed subscribers.
+    """
+
+    def __init__(
+        self,
+        manager_factory: Callable[[], IBClientManager] = _live_manager,
+        max_queue: int = 1000,
+    ) -> None:
+        """
+        Args:
+            manager_factory (Callable[[], IBClientManager]): Creates the client
+                manager for each (re)connection.
+            max_queue (int): Pending events kept per subscriber.
+        """
+        self._manager_factory = manager_factory
+        self._manager: Optional[IBClientManager] = None
+        self._lock = asyncio.Lock()
+        self._subscribers: Set[Subscriber] = set()
+        self.max_queue = max_queue
+
+    @property
+    def connected(self) -> bool:
+        """True while the managed IB client is connected."""
+        return self._manager is not None and self._manager.ib.isConnected()
+
+    async def ib(self) -> IB:
+        """
+        Return the synced IB client, connecting (or reconnecting) if needed.
+
+        Raises:
+            IBError: If the connection cannot be established.
+        """
+        if self._manager is not None and self.connected:
+            return self._manager.ib
+
+        async with self._lock:
+            if self._manager is not None and self.connected:
+                return self._manager.ib
+
+            manager = self._manager_factory()
+            # Subscribe before connecting so the initial sync is published too
+            self._attach(manager.ib)
+            await manager.connect()
+            try:
+                # The initial sync only lists this client's orders; also
+                # load those placed by other API clients
+                await manager.ib.reqAllOpenOrdersAsync()
+            except BaseException:
+                manager.disconnect()
+                raise
+            self._manager = manager
+            logger.info("Live IB state connected and synced")
+            return manager.ib
+
+    def _attach(self, ib: IB) -> None:
+        feeds = (
+            (ib.positionEvent, "position", position_to_dict),
+            (ib.updatePortfolioEvent, "portfolio", portfolio_item_to_dict),
+            (ib.accountValueEvent, "accountValue", account_value_to_dict),
+            (ib.openOrderEvent, "order", trade_to_dict),
+            (ib.orderStatusEvent, "order", trade_to_dict),
+        )
+        for event, kind, serialize in feeds:
+            event += partial(self._publish, kind, serialize)
+        ib.disconnectedEvent += lambda: self._publish(
+            "disconnected", lambda _: {}, None
+        )
+
+    def subscribe(self) -> Subscriber:
+        """Register a new change-feed subscriber."""
+        subscriber = Subscriber(queue=asyncio.Queue(maxsize=self.max_queue))
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Remove a change-feed subscriber."""
+        self._subscribers.discard(subscriber)
+
+    def _publish(
+        self, kind: str, serialize: Callable[[Any], Dict[str, Any]], obj: Any
+    ) -> None:
+        if not self._subscribers:
+            return
+        event = {"type": kind, "data": serialize(obj)}
+        for subscriber in self._subscribers:
+            if subscriber.queue.full():
+                subscriber.queue.get_nowait()
+                subscriber.overflowed = True
+            subscriber.queue.put_nowait(event)
+
+    async def positions(self, account: str = "") -> List[Dict[str, Any]]:
+        """Current positions, optionally for a single account."""
+        ib = await self.ib()
+        return [position_to_dict(p) for p in ib.positions(account)]
+
+    async def portfolio(self, account: str = "") -> List[Dict[str, Any]]:
+        """Current portfolio items, optionally for a single account."""
+        ib = await self.ib()
+        return [portfolio_item_to_dict(i) for i in ib.portfolio(account)]
+
+    async def account_values(self, account: str = "") -> List[Dict[str, Any]]:
+        """Current account values, optionally for a single account."""
+        ib = await self.ib()
+        return [account_value_to_dict(v) for v in ib.accountValues(account)]
+
+    async def open_orders(self) -> List[Dict[str, Any]]:
+        """Currently open orders with their status."""
+        ib = await self.ib()
+        return [trade_to_dict(t) for t in ib.openTrades()]
+
+    def close(self) -> None:
+        """Disconnect the long-lived client."""
+        if self._manager is not None:
+            self._manager.disconnect()
+            self._manager = None
+
+
+@lru_cache()
+def get_live_state() -> LiveIBState:
+    """Return the process-wide live IB state."""
+    return LiveIBState()
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Awaitable, Callable, Deque, Optional, TypeVar
+
+from app.ib.errors import IBError
+from app.ib.resilience import Deadline
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class PacingBudget:
+    """
+    Track historical data requests against IB's pacing limit.
+
+    IB allows at most ``max_requests`` historical requests in any sliding
+    ``window`` of seconds and answers further ones with pacing violations.
+    The budget records when requests were sent, so the time until another
+    one may be sent can be estimated, and holds requests back until then.
+    """
+
+    def __init__(
+        self,
+        max_requests: int = 60,
+        window: float = 600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            max_requests (int): Requests allowed per window.
+            window (float): Length of the sliding window in seconds.
+            clock (Callable[[], float]): Monotonic clock, injectable for tests.
+        """
+        self.max_requests = max_requests
+        self.window = window
+        self._clock = clock
+        self._sent: Deque[float] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._sent and self._sent[0] <= now - self.window:
+            self._sent.popleft()
+
+    @property
+    def used(self) -> int:
+        """Requests sent, or reserved to be sent, within the current window."""
+        self._prune(self._clock())
+        return len(self._sent)
+
+    def record(self) -> None:
+        """Record a historical request being sent now."""
+        now = self._clock()
+        self._prune(now)
+        self._sent.append(now)
+
+    def projected_wait(self, ahead: int = 0) -> float:
+        """
+        Estimate the seconds until one more request fits in the budget.
+
+        Args:
+            ahead (int): Requests that will be sent before this one.
+
+        Returns:
+            float: 0 if the request can be sent right away.
+        """
+        now = self._clock()
+        self._prune(now)
+        # Earliest send time of each request, existing ones followed by those
+        # ahead; each may go once the request max_requests before it expired
+        times = list(self._sent)
+        for _ in range(ahead + 1):
+            earliest = now
+            if len(times) >= self.max_requests:
+                earliest = max(now, times[-self.max_requests] + self.window)
+            times.append(earliest)
+        return times[-1] - now
+
+    async def acquire(self, deadline: Optional[Deadline] = None) -> None:
+        """
+        Wait until one more request fits in the budget and record it.
+
+        The slot is reserved before waiting, so concurrent requests queue up
+        behind each other instead of all being sent once the window frees.
+
+        Args:
+            deadline (Optional[Deadline]): Deadline the wait must end before.
+
+        Raises:
+            IBError: 429 if the wait would outlast ``deadline``.
+        """
+        wait = self.projected_wait()
+        if deadline is not None and wait > 0 and wait >= deadline.remaining():
+            raise IBError(
+                "IB pacing budget exhausted", status_code=429, retry_after=wait
+            )
+        send_at = self._clock() + wait
+        self._sent.append(send_at)
+        if wait <= 0:
+            return
+        logger.info(f"Waiting {wait:.1f}s for the IB pacing budget")
+        try:
+            await asyncio.sleep(wait)
+        except asyncio.CancelledError:
+            self._sent.remove(send_at)
+            raise
+
+
+@lru_cache()
+def get_pacing_budget() -> PacingBudget:
+    """Return the process-wide historical data pacing budget."""
+    ib_config = get_settings().ib
+    return PacingBudget(
+        max_requests=ib_config.hist_pacing_requests,
+        window=ib_config.hist_pacing_window,
+    )
+
+
+def paced(
+    factory: Callable[[], Awaitable[T]],
+    budget: Optional[PacingBudget] = None,
+    deadline: Optional[Deadline] = None,
+) -> Callable[[], Awaitable[T]]:
+    """
+    Wrap a historical request factory so every attempt, including retries,
+    waits for and is counted against the pacing budget.
+
+    Raises:
+        IBError: 429 from an attempt whose wait would outlast ``deadline``.
+    """
+
+    async def attempt() -> T:
+        await (budget or get_pacing_budget()).acquire(deadline)
+        return await factory()
+
+    return attempt
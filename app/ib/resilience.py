@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import random
+import time
+from functools import lru_cache
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from app.ib.errors import CircuitOpenError, IBError, classify_error
+from app.settings import get_settings
+from app.utils.tracing import span
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """
+    A point in time by which a request must complete.
+
+    Created once per request from the request-level timeout and passed to
+    every phase, so each IB call only gets the time that is left.
+    """
+
+    def __init__(
+        self, timeout: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Args:
+            timeout (float): Seconds from now until the deadline.
+            clock (Callable[[], float]): Monotonic clock, injectable for tests.
+        """
+        self._clock = clock
+        self.expires_at = clock() + timeout
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline, never negative."""
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        """True once no time is left."""
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Return the remaining time, optionally capped by a per-phase limit."""
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the IB gateway is unhealthy.
+
+    After ``failure_threshold`` consecutive transient failures the breaker
+    opens and rejects calls for ``reset_timeout`` seconds. It then lets a
+    single probe call through (half-open); the probe's outcome closes the
+    breaker again or re-opens it for another period.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Args:
+            failure_threshold (int): Consecutive failures that open the breaker.
+            reset_timeout (float): Seconds to stay open before probing.
+            clock (Callable[[], float]): Monotonic clock, injectable for tests.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        """Current breaker state: closed, open or half_open."""
+        if self._opened_at is None:
+            return self.CLOSED
+        if self._clock() - self._opened_at < self.reset_timeout:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def before_call(self) -> None:
+        """
+        Check whether a call may proceed.
+
+        Raises:
+            CircuitOpenError: If the breaker is open, or half-open with a probe
+                already in flight.
+        """
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            logger.info("Circuit breaker half-open; probing IB gateway")
+            self._probe_in_flight = True
+            return
+
+        assert self._opened_at is not None
+        retry_after = self._opened_at + self.reset_timeout - self._clock()
+        raise CircuitOpenError(retry_after=max(retry_after, 1.0))
+
+    def record_success(self) -> None:
+        """Record a call that reached a healthy gateway."""
+        if self._opened_at is not None:
+            logger.info("Circuit breaker closed; IB gateway recovered")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        """Record a transient gateway failure."""
+        self._failures += 1
+        if self._probe_in_flight or self._failures >= self.failure_threshold:
+            if self._opened_at is None or self._probe_in_flight:
+                logger.warning(
+                    f"Circuit breaker opened after {self._failures} failures"
+                )
+            self._opened_at = self._clock()
+        self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Release a probe whose outcome says nothing about gateway health."""
+        self._probe_in_flight = False
+
+
+@lru_cache()
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the process-wide circuit breaker guarding the IB gateway."""
+    ib_config = get_settings().ib
+    return CircuitBreaker(
+        failure_threshold=ib_config.breaker_failure_threshold,
+        reset_timeout=ib_config.breaker_reset_timeout,
+    )
+
+
+async def call_with_retries(
+    factory: Callable[[], Awaitable[T]],
+    deadline: Deadline,
+    phase: str,
+    timeout: Optional[float] = None,
+    retries: Optional[int] = None,
+    backoff: Optional[float] = None,
+    breaker: Optional[CircuitBreaker] = None,
+) -> T:
+    """
+    Run an IB call within the deadline, retrying transient failures.
+
+    Each attempt is bounded by the time left on ``deadline`` (and by
+    ``timeout``, if given). Transient failures are retried after a
+    full-jitter exponential backoff as long as time remains, and reported
+    to the circuit breaker. Running out of the request deadline is the
+    caller's choice rather than a gateway failure, so it is not counted.
+
+    Args:
+        factory (Callable[[], Awaitable[T]]): Creates a fresh awaitable per attempt.
+        deadline (Deadline): Request deadline shared by all phases.
+        phase (str): Name of the step, used in logs and error messages.
+        timeout (Optional[float]): Per-attempt cap in seconds.
+        retries (Optional[int]): Retries after the first attempt; defaults to settings.
+        backoff (Optional[float]): Base backoff in seconds; defaults to settings.
+        breaker (Optional[CircuitBreaker]): Defaults to the shared breaker.
+
+    Returns:
+        T: The result of the call.
+
+    Raises:
+        IBError: When the call fails with a classified error, the deadline
+            expires, or the circuit breaker is open.
+    """
+    ib_config = get_settings().ib
+    retries = ib_config.max_retries if retries is None else retries
+    backoff = ib_config.retry_backoff if backoff is None else backoff
+    breaker = breaker or get_circuit_breaker()
+
+    attempt = 0
+    while True:
+        if deadline.expired:
+            raise IBError(f"Deadline exceeded before {phase}", status_code=504)
+
+        breaker.before_call()
+        try:
+            with span(f"ib:{phase}", attempt=attempt):
+                result = await asyncio.wait_for(factory(), deadline.timeout(timeout))
+        except asyncio.CancelledError:
+            breaker.release()
+            raise
+        except Exception as exc:
+            if isinstance(exc, asyncio.TimeoutError) and deadline.expired:
+                # The caller's own deadline ran out, not the gateway's time
+                breaker.release()
+                raise IBError(
+                    f"Deadline exceeded during {phase}", status_code=504
+                ) from exc
+            error = classify_error(exc, phase)
+            if error is None or error is exc:
+                # Not raised by IB (e.g. the pacing budget); says nothing
+                # about gateway health
+                breaker.release()
+                raise
+            if not error.retryable:
+                # IB answered, so the gateway itself is healthy
+                breaker.record_success()
+                raise error from exc
+
+            breaker.record_failure()
+            delay = random.uniform(0, backoff * 2**attempt)
+            if attempt >= retries or delay >= deadline.remaining():
+                raise error from exc
+
+            attempt += 1
+            logger.warning(f"{error}; retry {attempt}/{retries} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+        else:
+            breaker.record_success()
+            return result
@@ -41,6 +41,16 @@ class _IBSettings(BaseSettings):
 
     host: str
     port: int
+    timezone: Optional[str] = None
+    live_client_id: int = 0
+    request_timeout: float = 60.0
+    connect_timeout: float = 10.0
+    max_retries: int = 2
+    retry_backoff: float = 0.5
+    breaker_failure_threshold: int = 5
+    breaker_reset_timeout: float = 30.0
+    hist_pacing_requests: int = 60
+    hist_pacing_window: float = 600.0
 
 
 class _LoggingSettings(BaseSettings):
@@ -68,6 +78,53 @@ class _UvicornSettings(BaseSettings):
     port: int = 8000
 
 
+class _StorageSettings(BaseSettings):
+    """Settings for the on-disk historical bar store."""
+
+    enabled: bool = False
+    path: str = "data/bars"
+    index_stride: int = 1024
+
+
+class _AvailabilitySettings(BaseSettings):
+    """Settings for the cached head timestamp (data availability) index."""
+
+    enabled: bool = True
+    path: Optional[str] = "data/head_timestamps.json"
+    ttl: float = 7 * 86400
+    failure_ttl: float = 3600.0
+
+
+class _SeriesCacheSettings(BaseSettings):
+    """Settings for the in-memory series cache behind incremental queries."""
+
+    enabled: bool = True
+    max_entries: int = 256
+    max_bars: int = 100_000
+    min_refresh: float = 1.0
+
+
+class _AdmissionSettings(BaseSettings):
+    """Settings for admission control of IB-bound endpoints."""
+
+    enabled: bool = True
+    max_in_flight: int = 8
+    max_per_client: int = 2
+    max_queue: int = 32
+    max_wait: float = 30.0
+
+
+class _ProfilingSettings(BaseSettings):
+    """Settings for the opt-in tracing and event-loop profiling hooks."""
+
+    enabled: bool = False
+    trace_path: str = "data/trace.json"
+    slow_callback_threshold: float = 0.1
+    loop_lag_interval: float = 0.5
+    loop_lag_threshold: float = 0.1
+    max_profile_seconds: float = 60.0
+
+
 class AppSettings(BaseSettings):
     """
     Application-wide settings object.
@@ -79,6 +136,11 @@ class AppSettings(BaseSettings):
     logging: _LoggingSettings
     fastapi: _FastAPISettings
     uvicorn: _UvicornSettings
+    storage: _StorageSettings = _StorageSettings()
+    availability: _AvailabilitySettings = _AvailabilitySettings()
+    series_cache: _SeriesCacheSettings = _SeriesCacheSettings()
+    admission: _AdmissionSettings = _AdmissionSettings()
+    profiling: _ProfilingSettings = _ProfilingSettings()
 
     model_config = {
         "env_prefix": "",
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Optional
+
+from app.utils.tracing import get_tracer
+
+logger = logging.getLogger(__name__)
+
+_original_handle_run: Optional[Callable[[asyncio.Handle], None]] = None
+_debug_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def install_slow_callback_detector(threshold: float) -> None:
+    """
+    Report event-loop callbacks that run longer than ``threshold`` seconds.
+
+    On asyncio's own event loops every callback (including ib_insync's socket
+    handling and each step of a request coroutine) is timed by wrapping the
+    private ``asyncio.Handle._run``, process-wide; slow ones are logged and
+    recorded as trace spans. Unlike asyncio debug mode this does not add
+    coroutine origin tracking, so it is cheap enough for production use.
+
+    Loops that do not run callbacks through ``asyncio.Handle`` (such as
+    uvloop) would never call the wrapper. On those the running loop is put
+    in debug mode with ``slow_callback_duration`` set instead, the documented
+    mechanism, which logs slow callbacks to the ``asyncio`` logger but does
+    not record trace spans.
+
+    Must be called from within the running event loop.
+
+    Args:
+        threshold (float): Duration in seconds above which a callback is slow.
+    """
+    global _original_handle_run, _debug_loop
+    if _original_handle_run is not None or _debug_loop is not None:
+        return
+
+    loop = asyncio.get_running_loop()
+    if not isinstance(loop, asyncio.BaseEventLoop):
+        logger.info(
+            f"{type(loop).__name__} bypasses asyncio.Handle; "
+            "detecting slow callbacks with asyncio debug mode"
+        )
+        loop.slow_callback_duration = threshold
+        loop.set_debug(True)
+        _debug_loop = loop
+        return
+
+    original = asyncio.Handle._run
+    _original_handle_run = original
+
+    def _timed_run(handle: asyncio.Handle) -> None:
+        start = time.perf_counter()
+        original(handle)
+        elapsed = time.perf_counter() - start
+        if elapsed >= threshold:
+            _report_slow_callback(handle, start, elapsed)
+
+    setattr(asyncio.Handle, "_run", _timed_run)
+
+
+def uninstall_slow_callback_detector() -> None:
+    """Restore the original event-loop callback execution."""
+    global _original_handle_run, _debug_loop
+    if _original_handle_run is not None:
+        setattr(asyncio.Handle, "_run", _original_handle_run)
+        _original_handle_run = None
+    if _debug_loop is not None:
+        _debug_loop.set_debug(False)
+        _debug_loop = None
+
+
+def _report_slow_callback(handle: Any, start: float, elapsed: float) -> None:
+    callback = repr(handle)
+    logger.warning(f"Slow event-loop callback took {elapsed * 1000:.1f} ms: {callback}")
+    tracer = get_tracer()
+    if tracer is not None:
+        end_us = time.time_ns() // 1000
+        duration_us = int(elapsed * 1_000_000)
+        tracer.complete(
+            "slow_callback", end_us - duration_us, duration_us, callback=callback
+        )
+
+
+async def monitor_loop_lag(interval: float, threshold: float) -> None:
+    """
+    Measure how late the event loop wakes up from a sleep, forever.
+
+    The lag is recorded as a trace counter on every tick and logged when it
+    exceeds ``threshold`` seconds. Cancel the task to stop monitoring.
+
+    Args:
+        interval (float): Seconds between measurements.
+        threshold (float): Lag in seconds above which a warning is logged.
+    """
+    tracer = get_tracer()
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - expected)
+        if tracer is not None:
+            tracer.counter("event_loop_lag", lag_ms=lag * 1000)
+        if lag >= threshold:
+            logger.warning(f"Event loop lagged by {lag * 1000:.1f} ms")
@@ -0,0 +1,53 @@
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Dict, Optional
+
+
+def _folded_stack(frame: Optional[FrameType]) -> str:
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def sample_thread(thread_id: int, duration: float, interval: float) -> Dict[str, int]:
+    """
+    Sample the stack of a thread at a fixed interval.
+
+    Meant to run in a helper thread while the target (usually the event
+    loop thread) keeps working; the target is never paused.
+
+    Args:
+        thread_id (int): ``threading.get_ident()`` of the thread to sample.
+        duration (float): Seconds to sample for.
+        interval (float): Seconds between samples.
+
+    Returns:
+        Dict[str, int]: Sample counts per semicolon-joined stack, root first.
+    """
+    if thread_id == threading.get_ident():
+        raise ValueError("A thread cannot sample itself")
+
+    counts: Counter[str] = Counter()
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        frame = sys._current_frames().get(thread_id)
+        if frame is None:
+            break
+        counts[_folded_stack(frame)] += 1
+        time.sleep(interval)
+    return dict(counts)
+
+
+def to_collapsed(counts: Dict[str, int]) -> str:
+    """
+    Format samples in the collapsed stack format (``stack count`` per line)
+    read by flamegraph.pl, speedscope and similar tools.
+    """
+    lines = sorted(counts.items(), key=lambda item: item[1], reverse=True)
+    return "".join(f"{stack} {count}\n" for stack, count in lines)
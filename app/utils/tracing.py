@@ -0,0 +1,169 @@
+import contextlib
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from pathlib import Path
+from typing import IO, Any, Dict, Iterator, Optional, Union
+
+from app.settings import get_settings
+
+# Trace "thread" of the request being handled, so its spans nest together
+_request_id: ContextVar[int] = ContextVar("trace_request_id", default=0)
+_request_ids = itertools.count(1)
+
+
+class Tracer:
+    """
+    Write trace events to a file in the Chrome Trace Event format.
+
+    The file is a JSON array that is appended to and never closed, which the
+    format explicitly allows; open it in Perfetto or chrome://tracing. Spans
+    of one request share a track so IB calls and encoding nest under it.
+
+    Recording an event only queues it, so the event loop being measured
+    never waits for the disk; a background thread encodes and writes queued
+    events every ``flush_interval`` seconds.
+    """
+
+    def __init__(self, path: Union[str, Path], flush_interval: float = 1.0) -> None:
+        """
+        Args:
+            path (Union[str, Path]): Trace file to append to.
+            flush_interval (float): Seconds between background writes.
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._file: Optional[IO[str]] = None
+        self._events: "queue.SimpleQueue[Dict[str, Any]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+        self._pid = os.getpid()
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        self._events.put(event)
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._stop.clear()
+                    self._writer = threading.Thread(
+                        target=self._run, name="trace-writer", daemon=True
+                    )
+                    self._writer.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all queued events to the trace file."""
+        with self._lock:
+            lines = []
+            while True:
+                try:
+                    event = self._events.get_nowait()
+                except queue.Empty:
+                    break
+                lines.append(json.dumps(event, default=str) + ",\n")
+            if not lines:
+                return
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                new = not self.path.exists() or self.path.stat().st_size == 0
+                self._file = self.path.open("a", encoding="utf-8")
+                if new:
+                    self._file.write("[\n")
+            self._file.writelines(lines)
+            self._file.flush()
+
+    def complete(self, name: str, start_us: int, duration_us: int, **args: Any) -> None:
+        """Record a finished span ("X" event)."""
+        self._write(
+            {
+                "name": name,
+                "ph": "X",
+                "ts": start_us,
+                "dur": duration_us,
+                "pid": self._pid,
+                "tid": _request_id.get(),
+                "args": args,
+            }
+        )
+
+    def counter(self, name: str, **values: float) -> None:
+        """Record counter values ("C" event), e.g. event-loop lag."""
+        self._write(
+            {
+                "name": name,
+                "ph": "C",
+                "ts": time.time_ns() // 1000,
+                "pid": self._pid,
+                "args": values,
+            }
+        )
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time the enclosed block as a span.
+
+        Yields a dict that may be updated with extra arguments for the span.
+        """
+        start = time.time_ns()
+        try:
+            yield args
+        finally:
+            self.complete(name, start // 1000, (time.time_ns() - start) // 1000, **args)
+
+    def close(self) -> None:
+        """Stop the background writer, write pending events and close the file."""
+        writer = self._writer
+        if writer is not None:
+            self._stop.set()
+            writer.join()
+        self.flush()
+        with self._lock:
+            self._writer = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+@lru_cache()
+def get_tracer() -> Optional[Tracer]:
+    """Return the shared tracer, or None when profiling is disabled."""
+    profiling = get_settings().profiling
+    if not profiling.enabled:
+        return None
+    return Tracer(profiling.trace_path)
+
+
+@contextlib.contextmanager
+def span(name: str, **args: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Record a span with the shared tracer; does nothing when tracing is off.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield args
+        return
+    with tracer.span(name, **args) as span_args:
+        yield span_args
+
+
+@contextlib.contextmanager
+def request_span(name: str, **args: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Start a new request track and record its root span.
+    """
+    token = _request_id.set(next(_request_ids))
+    try:
+        with span(name, **args) as span_args:
+            yield span_args
+    finally:
+        _request_id.reset(token)
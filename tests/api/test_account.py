@@ -0,0 +1,97 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from ib_insync import AccountValue, Contract, Position
+
+from app.api.account import _event_stream
+from app.ib import CircuitOpenError
+from app.ib.live_state import LiveIBState
+
+
+def _live_state(ib):
+    ib.reqAllOpenOrdersAsync = AsyncMock(return_value=[])
+    manager = MagicMock()
+    manager.ib = ib
+    manager.connect = AsyncMock(return_value=ib)
+    return LiveIBState(manager_factory=lambda: manager)
+
+
+@pytest.mark.asyncio
+@patch("app.api.account.get_live_state")
+async def test_get_positions(mock_get_live_state, async_client):
+    ib = MagicMock()
+    ib.positions.return_value = [
+        Position("DU123", Contract(conId=265598, symbol="AAPL"), 10.0, 150.0)
+    ]
+    mock_get_live_state.return_value = _live_state(ib)
+
+    response = await async_client.get("/account/positions", params={"account": "DU123"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "account": "DU123",
+            "contract": {"conId": 265598, "symbol": "AAPL"},
+            "position": 10.0,
+            "avgCost": 150.0,
+        }
+    ]
+    ib.positions.assert_called_once_with("DU123")
+
+
+@pytest.mark.asyncio
+@patch("app.api.account.get_live_state")
+async def test_get_account_values(mock_get_live_state, async_client):
+    ib = MagicMock()
+    ib.accountValues.return_value = [
+        AccountValue("DU123", "NetLiquidation", "1000", "USD", "")
+    ]
+    mock_get_live_state.return_value = _live_state(ib)
+
+    response = await async_client.get("/account/values")
+    assert response.status_code == 200
+    assert response.json()[0]["tag"] == "NetLiquidation"
+
+
+@pytest.mark.asyncio
+@patch("app.api.account.get_live_state")
+async def test_get_open_orders_and_portfolio_empty(mock_get_live_state, async_client):
+    ib = MagicMock()
+    ib.openTrades.return_value = []
+    ib.portfolio.return_value = []
+    mock_get_live_state.return_value = _live_state(ib)
+
+    assert (await async_client.get("/account/openOrders")).json() == []
+    assert (await async_client.get("/account/portfolio")).json() == []
+
+
+@pytest.mark.asyncio
+@patch("app.api.account.get_live_state")
+async def test_account_unavailable(mock_get_live_state, async_client):
+    state = MagicMock()
+    state.ib = AsyncMock(side_effect=CircuitOpenError(retry_after=5))
+    mock_get_live_state.return_value = state
+
+    response = await async_client.get("/account/positions")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+
+@pytest.mark.asyncio
+async def test_event_stream_formats_server_sent_events(monkeypatch):
+    monkeypatch.setattr("app.api.account._KEEP_ALIVE", 0.01)
+    state = LiveIBState(manager_factory=MagicMock())
+    subscriber = state.subscribe()
+    await subscriber.queue.put({"type": "position", "data": {"position": 1.0}})
+    subscriber.overflowed = True
+
+    request = MagicMock()
+    request.is_disconnected = AsyncMock(side_effect=[False, False, True])
+
+    chunks = [chunk async for chunk in _event_stream(request, state, subscriber)]
+
+    assert chunks == [
+        "event: overflow\ndata: {}\n\n",
+        'event: position\ndata: {"position": 1.0}\n\n',
+        ": keep-alive\n\n",
+    ]
+    assert subscriber not in state._subscribers
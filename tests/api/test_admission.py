@@ -0,0 +1,91 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.admission import AdmissionController
+from app.ib.pacing import PacingBudget
+
+
+def _controller(**kwargs):
+    pacing = kwargs.pop("pacing", None) or PacingBudget(max_requests=60, window=600)
+    return AdmissionController("test", pacing=pacing, **kwargs)
+
+
+async def test_admits_up_to_in_flight_limit_then_queues():
+    controller = _controller(max_in_flight=1, max_per_client=5)
+    await controller.acquire("a")
+
+    waiter = asyncio.create_task(controller.acquire("b"))
+    await asyncio.sleep(0)
+    assert controller.queued == 1
+    assert not waiter.done()
+
+    controller.release("a")
+    await waiter
+    assert controller.in_flight == 1
+    assert controller.queued == 0
+
+    controller.release("b")
+    assert controller.in_flight == 0
+
+
+async def test_rejects_client_over_its_limit():
+    controller = _controller(max_per_client=1)
+    await controller.acquire("a")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.acquire("a")
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "1"}
+    await controller.acquire("b")
+
+
+async def test_rejects_when_queue_is_full():
+    controller = _controller(max_in_flight=1, max_queue=0)
+    await controller.acquire("a")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.acquire("b")
+
+    assert exc_info.value.status_code == 429
+
+
+async def test_rejects_with_retry_after_from_pacing_budget():
+    pacing = PacingBudget(max_requests=1, window=600)
+    pacing.record()
+    controller = _controller(pacing=pacing, max_wait=30)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.acquire("a")
+
+    assert exc_info.value.status_code == 429
+    retry_after = int(exc_info.value.headers["Retry-After"])
+    assert 590 <= retry_after <= 600
+
+
+def test_check_pacing_counts_every_historical_request():
+    pacing = PacingBudget(max_requests=3, window=600)
+    pacing.record()
+    controller = _controller(pacing=pacing, max_wait=30)
+
+    controller.check_pacing(2)
+    with pytest.raises(HTTPException) as exc_info:
+        controller.check_pacing(3)
+
+    assert exc_info.value.status_code == 429
+    assert 590 <= int(exc_info.value.headers["Retry-After"]) <= 600
+
+
+async def test_queued_request_times_out():
+    controller = _controller(max_in_flight=1, max_wait=0.01)
+    await controller.acquire("a")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await controller.acquire("b")
+
+    assert exc_info.value.status_code == 429
+    assert controller.queued == 0
+    controller.release("a")
+    assert controller.in_flight == 0
@@ -0,0 +1,20 @@
+from unittest.mock import MagicMock, patch
+
+
+async def test_profile_disabled(async_client):
+    response = await async_client.get("/debug/profile")
+    assert response.status_code == 404
+
+
+@patch("app.api.debug.get_settings")
+async def test_profile_returns_collapsed_stacks(mock_get_settings, async_client):
+    mock_get_settings.return_value = MagicMock(
+        profiling=MagicMock(enabled=True, max_profile_seconds=0.05)
+    )
+
+    response = await async_client.get("/debug/profile?seconds=10&interval_ms=5")
+
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
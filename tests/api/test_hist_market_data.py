@@ -1,6 +1,14 @@
+import datetime as dt
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from ib_insync import BarData, Contract, RequestError
+
+from app.data import BarKey, BarSeries, BarStore
+from app.data.availability import HeadKey, HeadTimestampIndex
+from app.data.series_cache import SeriesCache
+from app.ib import CircuitOpenError
+from app.ib.pacing import get_pacing_budget
 
 
 @pytest.mark.asyncio
@@ -14,18 +22,34 @@ async def test_get_hist_market_data_success(mock_ib_client_manager, async_client
     )
     mock_ib.qualifyContractsAsync = AsyncMock(return_value=[mock_contract])
 
-    bar = MagicMock()
-    bar.date = "2024-07-10"
-    bar.open = 100
-    bar.close = 110
-    bar.__dict__ = {"date": "2024-07-10", "open": 100, "close": 110}
+    bar = BarData(
+        date=dt.date(2024, 7, 10),
+        open=100,
+        high=115,
+        low=95,
+        close=110,
+        volume=1000,
+        average=105,
+        barCount=42,
+    )
 
     mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[bar])
     mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
 
     response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
     assert response.status_code == 200
-    assert response.json() == [{"date": "2024-07-10", "open": 100, "close": 110}]
+    assert response.json() == [
+        {
+            "date": "2024-07-10",
+            "open": 100,
+            "high": 115,
+            "low": 95,
+            "close": 110,
+            "volume": 1000,
+            "average": 105,
+            "barCount": 42,
+        }
+    ]
 
 
 @pytest.mark.asyncio
@@ -69,8 +93,11 @@ async def test_get_hist_market_data_with_end_datetime(
     )
     mock_ib.qualifyContractsAsync = AsyncMock(return_value=[mock_contract])
 
-    bar = MagicMock()
-    bar.__dict__ = {"date": "2024-07-11", "open": 200, "close": 210}
+    bar = BarData(
+        date=dt.datetime(2024, 7, 10, 13, 55, tzinfo=dt.timezone.utc),
+        open=200,
+        close=210,
+    )
     mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[bar])
 
     mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
@@ -84,8 +111,636 @@ async def test_get_hist_market_data_with_end_datetime(
             "what_to_show": "MIDPOINT",
             "use_rth": 0,
             "end_datetime": "20240710 14:00:00",
+            "timezone": "utc",
         },
     )
     assert response.status_code == 200
+    assert response.json()[0]["date"] == "2024-07-10T13:55:00Z"
     assert response.json()[0]["open"] == 200
     assert response.json()[0]["close"] == 210
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_dates_default_to_tws_local_time(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=_bars((25, 1.0)))
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+
+    # Same naive TWS-local datetimes as before timestamps were requested in UTC
+    assert response.status_code == 200
+    assert response.json()[0]["date"] == "2024-07-10T09:55:00-04:00"
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_columns_format(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = MagicMock()
+    mock_contract = MagicMock()
+    mock_ib.reqContractDetailsAsync = AsyncMock(
+        return_value=[MagicMock(contract=mock_contract)]
+    )
+    mock_ib.qualifyContractsAsync = AsyncMock(return_value=[mock_contract])
+
+    start = dt.datetime(2024, 7, 10, 13, 30, tzinfo=dt.timezone.utc)
+    bars = [
+        BarData(date=start + dt.timedelta(minutes=i), open=i, close=i + 1)
+        for i in range(3)
+    ]
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=bars)
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get(
+        "/histMktData/", params={"symbol": "AAPL", "format": "columns"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["timestamp"] == [1720618200, 1720618260, 1720618320]
+    assert body["open"] == [0, 1, 2]
+    assert body["close"] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_bar_store")
+async def test_get_stored_market_data(mock_get_bar_store, async_client, tmp_path):
+    store = BarStore(tmp_path)
+    key = BarKey("265598", "1 min", "TRADES", True)
+    store.append(
+        key,
+        BarSeries.from_columns({"timestamp": [0, 60, 120], "close": [1, 2, 3]}),
+        now=1_000_000,
+    )
+    mock_get_bar_store.return_value = store
+
+    response = await async_client.get(
+        "/histMktData/stored",
+        params={
+            "con_id": 265598,
+            "start": "1970-01-01T00:01:00",
+            "format": "columns",
+        },
+    )
+    assert response.status_code == 200
+    assert response.json()["timestamp"] == [60, 120]
+    assert response.json()["close"] == [2, 3]
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_bar_store")
+async def test_get_stored_market_data_not_found(
+    mock_get_bar_store, async_client, tmp_path
+):
+    mock_get_bar_store.return_value = BarStore(tmp_path)
+    response = await async_client.get("/histMktData/stored", params={"con_id": 1})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_bar_store", return_value=None)
+async def test_get_stored_market_data_disabled(_mock_get_bar_store, async_client):
+    response = await async_client.get("/histMktData/stored", params={"con_id": 1})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Bar storage is disabled"
+
+
+def _mock_ib_with_contract():
+    mock_ib = MagicMock()
+    mock_contract = MagicMock()
+    mock_ib.reqContractDetailsAsync = AsyncMock(
+        return_value=[MagicMock(contract=mock_contract)]
+    )
+    mock_ib.qualifyContractsAsync = AsyncMock(return_value=[mock_contract])
+    return mock_ib
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_maps_ib_error_code(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=RequestError(1, 321, "Error validating request")
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    assert response.status_code == 400
+    assert "321" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_no_data_returns_empty(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=RequestError(1, 162, "HMDS query returned no data")
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_circuit_open(mock_ib_client_manager, async_client):
+    mock_ib_client_manager.return_value.__aenter__.side_effect = CircuitOpenError(
+        retry_after=12
+    )
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "12"
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_rejected_when_pacing_exhausted(
+    mock_ib_client_manager, async_client
+):
+    budget = get_pacing_budget()
+    for _ in range(budget.max_requests):
+        budget.record()
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    mock_ib_client_manager.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_symbol_path_skips_qualify(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[])
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    assert response.status_code == 200
+    mock_ib.reqContractDetailsAsync.assert_awaited_once()
+    mock_ib.qualifyContractsAsync.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_con_id_fast_path(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = MagicMock()
+    mock_ib.reqContractDetailsAsync = AsyncMock()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[])
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get("/histMktData/", params={"con_id": 265598})
+    assert response.status_code == 200
+
+    mock_ib.reqContractDetailsAsync.assert_not_awaited()
+    contract = mock_ib.reqHistoricalDataAsync.await_args.args[0]
+    assert contract.conId == 265598
+    assert contract.exchange == "SMART"
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_fully_specified_future(
+    mock_ib_client_manager, async_client
+):
+    mock_ib = MagicMock()
+    mock_ib.reqContractDetailsAsync = AsyncMock()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[])
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get(
+        "/histMktData/",
+        params={
+            "symbol": "ES",
+            "sec_type": "FUT",
+            "exchange": "CME",
+            "last_trade_date_or_contract_month": "202412",
+        },
+    )
+    assert response.status_code == 200
+
+    mock_ib.reqContractDetailsAsync.assert_not_awaited()
+    contract = mock_ib.reqHistoricalDataAsync.await_args.args[0]
+    assert (contract.symbol, contract.secType, contract.exchange) == (
+        "ES",
+        "FUT",
+        "CME",
+    )
+    assert contract.lastTradeDateOrContractMonth == "202412"
+
+
+@pytest.mark.asyncio
+async def test_get_hist_market_data_requires_contract(async_client):
+    response = await async_client.get("/histMktData/")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_head_timestamp_index")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_rejects_range_before_head(
+    mock_ib_client_manager, mock_get_index, async_client
+):
+    index = HeadTimestampIndex(None, ttl=3600)
+    index.put(HeadKey("265598", "TRADES", True), 1_700_000_000)
+    mock_get_index.return_value = index
+
+    response = await async_client.get(
+        "/histMktData/",
+        params={
+            "con_id": 265598,
+            "duration": "5 D",
+            "end_datetime": "20200101 00:00:00",
+        },
+    )
+    assert response.status_code == 404
+    assert "No data available" in response.json()["detail"]
+    mock_ib_client_manager.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_head_timestamp_index")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_clips_to_fetched_head(
+    mock_ib_client_manager, mock_get_index, async_client
+):
+    index = HeadTimestampIndex(None, ttl=3600)
+    mock_get_index.return_value = index
+
+    mock_ib = MagicMock()
+    mock_ib.reqHeadTimeStampAsync = AsyncMock(
+        return_value=dt.datetime(2023, 12, 25, tzinfo=dt.timezone.utc)
+    )
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[])
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get(
+        "/histMktData/",
+        params={
+            "con_id": 265598,
+            "duration": "1 Y",
+            "end_datetime": "20240101 00:00:00",
+        },
+    )
+    assert response.status_code == 200
+    assert mock_ib.reqHistoricalDataAsync.await_args.kwargs["durationStr"] == "8 D"
+    assert index.get(HeadKey("265598", "TRADES", True)) == 1703462400
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_head_timestamp_index")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_caches_failed_head_lookup(
+    mock_ib_client_manager, mock_get_index, async_client
+):
+    index = HeadTimestampIndex(None, ttl=3600)
+    mock_get_index.return_value = index
+
+    mock_ib = MagicMock()
+    mock_ib.reqHeadTimeStampAsync = AsyncMock(
+        side_effect=RequestError(1, 321, "Invalid what to show")
+    )
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=[])
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    for _ in range(2):
+        response = await async_client.get("/histMktData/", params={"con_id": 265598})
+        assert response.status_code == 200
+
+    mock_ib.reqHeadTimeStampAsync.assert_awaited_once()
+    assert index.failed(HeadKey("265598", "TRADES", True))
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_head_timestamp_index")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_head_timestamp_uses_cache(
+    mock_ib_client_manager, mock_get_index, async_client
+):
+    index = HeadTimestampIndex(None, ttl=3600)
+    mock_get_index.return_value = index
+
+    mock_ib = MagicMock()
+    mock_ib.reqHeadTimeStampAsync = AsyncMock(
+        return_value=dt.datetime(1980, 12, 12, 14, 30, tzinfo=dt.timezone.utc)
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    for _ in range(2):
+        response = await async_client.get(
+            "/histMktData/headTimestamp", params={"con_id": 265598}
+        )
+        assert response.status_code == 200
+        assert response.json()["head_timestamp"] == "1980-12-12T14:30:00+00:00"
+
+    mock_ib.reqHeadTimeStampAsync.assert_awaited_once()
+
+    response = await async_client.get("/histMktData/headTimestamps")
+    assert [entry["contract"] for entry in response.json()] == ["265598"]
+
+
+@pytest.mark.asyncio
+async def test_get_head_timestamp_disabled(async_client):
+    response = await async_client.get(
+        "/histMktData/headTimestamp", params={"con_id": 265598}
+    )
+    assert response.status_code == 404
+
+
+def _bars(*closes_at):
+    start = dt.datetime(2024, 7, 10, 13, 30, tzinfo=dt.timezone.utc)
+    return [
+        BarData(date=start + dt.timedelta(minutes=m), close=c) for m, c in closes_at
+    ]
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_panel_aligns_symbols(mock_ib_client_manager, async_client):
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=[_bars((0, 1.0), (1, 2.0)), _bars((1, 10.0), (2, 11.0))]
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get(
+        "/histMktData/panel", params={"symbols": "AAPL,MSFT", "ffill": True}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["field"] == "close"
+    assert body["timestamp"] == [1720618200, 1720618260, 1720618320]
+    assert body["columns"] == {"AAPL": [1.0, 2.0, 2.0], "MSFT": [None, 10.0, 11.0]}
+    assert mock_ib.reqHistoricalDataAsync.await_count == 2
+    mock_ib_client_manager.assert_called_once()
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_panel_rejects_when_budget_cannot_fit_symbols(
+    mock_ib_client_manager, async_client
+):
+    budget = get_pacing_budget()
+    for _ in range(budget.max_requests - 1):
+        budget.record()
+
+    response = await async_client.get(
+        "/histMktData/panel", params={"symbols": "AAPL,MSFT"}
+    )
+
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+    mock_ib_client_manager.assert_not_called()
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_panel_maps_ib_errors(mock_ib_client_manager, async_client):
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=RequestError(1, 321, "Error validating request")
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get(
+        "/histMktData/panel", params=[("symbols", "AAPL"), ("symbols", "MSFT")]
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_bar_store")
+async def test_get_panel_from_store(mock_get_bar_store, async_client, tmp_path):
+    store = BarStore(tmp_path)
+    for con_id, closes in (("1", [1, 2, 3]), ("2", [5, 6, 7])):
+        store.append(
+            BarKey(con_id, "1 min", "TRADES", True),
+            BarSeries.from_columns({"timestamp": [0, 60, 120], "close": closes}),
+            now=1_000_000,
+        )
+    mock_get_bar_store.return_value = store
+
+    response = await async_client.get(
+        "/histMktData/panel",
+        params={"symbols": "1,2", "source": "stored", "join": "inner"},
+    )
+    assert response.status_code == 200
+    assert response.json()["columns"] == {"1": [1, 2, 3], "2": [5, 6, 7]}
+
+    response = await async_client.get(
+        "/histMktData/panel", params={"symbols": "AAPL", "source": "stored"}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_get_panel_requires_symbols(async_client):
+    response = await async_client.get("/histMktData/panel", params={"symbols": ","})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_series_cache")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_incremental_polling(
+    mock_ib_client_manager, mock_get_series_cache, async_client
+):
+    start = 1720618200
+    now = [start + 150]
+    cache = SeriesCache(min_refresh=0, clock=lambda: now[0])
+    mock_get_series_cache.return_value = cache
+    mock_ib = MagicMock()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=[
+            _bars((0, 1.0), (1, 2.0), (2, 3.0)),
+            _bars((2, 3.5), (3, 4.0)),
+        ]
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+    params = {"con_id": 265598, "format": "columns"}
+
+    response = await async_client.get("/histMktData/", params=params)
+    assert response.status_code == 200
+    assert len(response.json()["timestamp"]) == 3
+    cursor = response.headers["X-Next-Cursor"]
+
+    # The last bar was incomplete, so polling re-sends it with new bars only
+    now[0] += 60
+    response = await async_client.get(
+        "/histMktData/", params={**params, "cursor": cursor}
+    )
+    assert response.status_code == 200
+    assert response.json()["timestamp"] == [start + 120, start + 180]
+    assert response.json()["close"] == [3.5, 4.0]
+    tail_request = mock_ib.reqHistoricalDataAsync.await_args_list[1]
+    assert tail_request.kwargs["durationStr"] == "150 S"
+
+    # A fresh cache entry answers without contacting IB
+    cache.min_refresh = 60
+    response = await async_client.get(
+        "/histMktData/", params={**params, "since": str(start + 120)}
+    )
+    assert response.json()["timestamp"] == [start + 180]
+    assert mock_ib.reqHistoricalDataAsync.await_count == 2
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.time")
+@patch("app.api.hist_mkt_data.get_series_cache")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_since_before_cached_bars_fetches_window(
+    mock_ib_client_manager, mock_get_series_cache, mock_time, async_client
+):
+    start = 1720618200
+    mock_time.time.return_value = start + 200
+    cache = SeriesCache(min_refresh=60, clock=lambda: start + 200)
+    mock_get_series_cache.return_value = cache
+    mock_ib = MagicMock()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=[
+            _bars((2, 3.0), (3, 4.0)),
+            _bars((0, 1.0), (1, 2.0), (2, 3.0)),
+        ]
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+    params = {"con_id": 265598, "format": "columns"}
+
+    # A short window fills the cache from start + 120 on
+    await async_client.get("/histMktData/", params={**params, "duration": "60 S"})
+
+    response = await async_client.get(
+        "/histMktData/", params={**params, "duration": "1 D", "since": str(start)}
+    )
+    assert response.json()["timestamp"] == [start + 60, start + 120]
+    window_request = mock_ib.reqHistoricalDataAsync.await_args_list[1]
+    assert window_request.kwargs["durationStr"] == "1 D"
+    # The longer window is merged in, keeping the cached newer bar
+    cached = cache.get(BarKey("265598", "1 min", "TRADES", True))
+    assert cached.series.timestamp.tolist() == [start + i * 60 for i in range(4)]
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.time")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_widens_window_to_reach_since(
+    mock_ib_client_manager, mock_time, async_client
+):
+    start = 1720618200
+    mock_time.time.return_value = start + 4200
+    mock_ib = MagicMock()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        return_value=_bars((0, 1.0), (1, 2.0), (60, 3.0))
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get(
+        "/histMktData/",
+        params={
+            "con_id": 265598,
+            "duration": "600 S",
+            "since": str(start),
+            "format": "columns",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json()["timestamp"] == [start + 60, start + 3600]
+    window_request = mock_ib.reqHistoricalDataAsync.await_args
+    assert window_request.kwargs["durationStr"] == "4259 S"
+
+    # A window that cannot be widened is rejected rather than cut short
+    response = await async_client.get(
+        "/histMktData/",
+        params={
+            "con_id": 265598,
+            "duration": "600 S",
+            "bar_size": "1 tick",
+            "since": str(start),
+        },
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_series_cache")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_polling_reuses_resolved_contract(
+    mock_ib_client_manager, mock_get_series_cache, async_client
+):
+    start = 1720618200
+    now = [start + 150]
+    mock_get_series_cache.return_value = SeriesCache(
+        min_refresh=0, clock=lambda: now[0]
+    )
+    mock_ib = _mock_ib_with_contract()
+    mock_ib.reqHistoricalDataAsync = AsyncMock(
+        side_effect=[_bars((0, 1.0), (1, 2.0), (2, 3.0)), _bars((2, 3.5))]
+    )
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    response = await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    now[0] += 60
+    response = await async_client.get(
+        "/histMktData/",
+        params={"symbol": "AAPL", "cursor": response.headers["X-Next-Cursor"]},
+    )
+
+    assert response.status_code == 200
+    mock_ib.reqContractDetailsAsync.assert_awaited_once()
+    contract = mock_ib.reqContractDetailsAsync.return_value[0].contract
+    tail_request = mock_ib.reqHistoricalDataAsync.await_args_list[1]
+    assert tail_request.args[0] is contract
+
+
+@pytest.mark.asyncio
+async def test_get_hist_market_data_rejects_invalid_since(async_client):
+    params = {"con_id": 265598}
+    for extra in (
+        {"since": "0", "end_datetime": "20240710 14:00:00"},
+        {"since": "yesterday"},
+        {"cursor": "garbage"},
+        {"since": "0", "cursor": "garbage"},
+    ):
+        response = await async_client.get("/histMktData/", params={**params, **extra})
+        assert response.status_code == 422, extra
+
+
+@pytest.mark.asyncio
+@patch("app.api.hist_mkt_data.get_bar_store")
+@patch("app.api.hist_mkt_data.IBClientManager")
+async def test_get_hist_market_data_stores_bars_by_con_id_only(
+    mock_ib_client_manager, mock_get_bar_store, async_client, tmp_path
+):
+    store = BarStore(tmp_path)
+    mock_get_bar_store.return_value = store
+    mock_ib = MagicMock()
+    mock_ib.reqContractDetailsAsync = AsyncMock(
+        return_value=[MagicMock(contract=Contract(conId=265598, symbol="AAPL"))]
+    )
+    mock_ib.reqHistoricalDataAsync = AsyncMock(return_value=_bars((0, 1.0)))
+    mock_ib_client_manager.return_value.__aenter__.return_value = mock_ib
+
+    # Resolved through contract details: stored under the conId
+    await async_client.get("/histMktData/", params={"symbol": "AAPL"})
+    # Fully specified without a conId: used as-is and not stored
+    await async_client.get(
+        "/histMktData/", params={"symbol": "AAPL", "primary_exchange": "NASDAQ"}
+    )
+
+    assert store.length(BarKey("265598", "1 min", "TRADES", True)) == 1
+    assert [p.name for p in tmp_path.iterdir()] == ["265598"]
@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from app.api.admission import get_admission_controller
+from app.data.series_cache import get_series_cache
+from app.ib.pacing import get_pacing_budget
+from app.ib.resilience import get_circuit_breaker
+
+# Modules load settings without an explicit path; use the test config for them
+os.environ.setdefault("APP_CONFIG", "tests/test_config.yml")
+
+
+_SHARED_STATE = (
+    get_circuit_breaker,
+    get_pacing_budget,
+    get_admission_controller,
+    get_series_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_shared_state():
+    """
+    Give every test a fresh, closed IB circuit breaker, an unused pacing
+    budget, idle admission controllers and an empty series cache.
+    """
+    for factory in _SHARED_STATE:
+        factory.cache_clear()
+    yield
+    for factory in _SHARED_STATE:
+        factory.cache_clear()
@@ -0,0 +1,113 @@
+import json
+
+import pytest
+
+from app.data.availability import (
+    HeadKey,
+    HeadTimestampIndex,
+    clip_duration,
+    min_duration,
+    parse_duration,
+    parse_end_datetime,
+)
+
+DAY = 86400
+KEY = HeadKey("265598", "trades", True)
+
+
+@pytest.mark.parametrize(
+    "duration, expected",
+    [("30 S", 30), ("2 D", 2 * DAY), ("1 W", 7 * DAY), ("6 M", 186 * DAY)],
+)
+def test_parse_duration(duration, expected):
+    assert parse_duration(duration) == expected
+
+
+def test_min_duration_is_a_lower_bound():
+    assert min_duration("600 S") == 600
+    assert min_duration("1 M") == 28 * DAY
+    assert min_duration("1 Y") < parse_duration("1 Y")
+
+
+def test_parse_duration_invalid():
+    with pytest.raises(ValueError, match="Invalid duration"):
+        parse_duration("forever")
+
+
+def test_parse_end_datetime():
+    assert parse_end_datetime(None, now=123.9) == 123
+    assert parse_end_datetime("19700102 00:00:00", now=0) == DAY
+    assert parse_end_datetime("19700102-00:00:00", now=0) == DAY
+    assert parse_end_datetime("19700102 01:00:00 Europe/London", now=0) == DAY
+
+
+def test_clip_duration_keeps_ranges_after_head():
+    assert clip_duration("5 D", end=100 * DAY, head=10 * DAY) == "5 D"
+
+
+def test_clip_duration_shortens_to_head():
+    assert clip_duration("1 Y", end=100 * DAY, head=90 * DAY) == "11 D"
+    assert clip_duration("10 Y", end=1000 * DAY, head=100 * DAY) == "3 Y"
+
+
+def test_clip_duration_rejects_ranges_before_head():
+    assert clip_duration("5 D", end=10 * DAY, head=100 * DAY) is None
+
+
+def test_index_persists_and_expires(tmp_path):
+    now = [1000.0]
+    path = tmp_path / "heads.json"
+    index = HeadTimestampIndex(path, ttl=60, clock=lambda: now[0])
+
+    index.put(KEY, 345_427_200)
+    assert index.get(KEY) == 345_427_200
+    assert json.loads(path.read_text())["265598|TRADES|rth"]["head"] == 345_427_200
+
+    # A new index instance loads the persisted entry
+    reloaded = HeadTimestampIndex(path, ttl=60, clock=lambda: now[0])
+    assert reloaded.get(KEY) == 345_427_200
+    assert reloaded.entries()[0]["head_timestamp"] == "1980-12-12T00:00:00+00:00"
+
+    now[0] += 61
+    assert reloaded.get(KEY) is None
+    assert reloaded.entry(KEY) is not None
+
+
+def test_index_records_failed_lookups(tmp_path):
+    now = [1000.0]
+    path = tmp_path / "heads.json"
+    index = HeadTimestampIndex(path, ttl=60, failure_ttl=10, clock=lambda: now[0])
+
+    index.put_failure(KEY, "Error 162: no head time stamp")
+    assert index.failed(KEY)
+    assert index.get(KEY) is None
+    # Persisted like positive entries
+    reloaded = HeadTimestampIndex(path, ttl=60, failure_ttl=10, clock=lambda: now[0])
+    assert reloaded.failed(KEY)
+
+    now[0] += 11
+    assert not index.failed(KEY)
+
+    # A later success replaces the failure
+    index.put(KEY, 345_427_200)
+    assert not index.failed(KEY)
+    assert index.get(KEY) == 345_427_200
+
+
+def test_failure_after_expiry_keeps_stale_head_unserved():
+    now = [1000.0]
+    index = HeadTimestampIndex(None, ttl=60, failure_ttl=10, clock=lambda: now[0])
+    index.put(KEY, 345_427_200)
+    now[0] += 61
+
+    index.put_failure(KEY, "timeout")
+
+    assert index.failed(KEY)
+    assert index.get(KEY) is None
+    assert index.entry(KEY)["head"] == 345_427_200
+
+
+def test_index_ignores_corrupt_file(tmp_path):
+    path = tmp_path / "heads.json"
+    path.write_text("{not json")
+    assert HeadTimestampIndex(path, ttl=60).entries() == []
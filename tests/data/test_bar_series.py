@@ -0,0 +1,143 @@
+import datetime as dt
+import json
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+from ib_insync import BarData
+
+from app.data import BarSeries
+
+
+def _series(timestamps, **columns):
+    return BarSeries.from_columns({"timestamp": timestamps, **columns})
+
+
+def test_from_bars_converts_to_columns():
+    """Bars are converted into typed, contiguous arrays."""
+    start = dt.datetime(2024, 7, 10, 13, 30, tzinfo=dt.timezone.utc)
+    bars = [
+        BarData(date=start, open=1, high=2, low=0.5, close=1.5, volume=10, barCount=3),
+        BarData(date=start + dt.timedelta(minutes=1), open=1.5, close=2, volume=5),
+    ]
+
+    series = BarSeries.from_bars(bars)
+
+    assert len(series) == 2
+    assert not series.daily
+    assert series.timestamp.dtype == np.int64
+    assert series.close.dtype == np.float64
+    assert series.close.flags["C_CONTIGUOUS"]
+    assert series.timestamp.tolist() == [1720618200, 1720618260]
+    assert series.volume.tolist() == [10, 5]
+    assert series.bar_count.tolist() == [3, 0]
+
+
+def test_from_bars_daily_serializes_dates():
+    """Dated bars keep date-only formatting."""
+    series = BarSeries.from_bars([BarData(date=dt.date(2024, 7, 10), close=1)])
+
+    assert series.daily
+    assert json.loads(series.to_json())[0]["date"] == "2024-07-10"
+
+
+def test_from_bars_empty():
+    series = BarSeries.from_bars([])
+    assert len(series) == 0
+    assert series.to_json() == b"[]"
+
+
+def test_to_json_records_match_bardata_keys():
+    """Records keep the BarData attribute names."""
+    series = _series([0], open=[1.0], close=[2.0])
+    record = json.loads(series.to_json())[0]
+
+    assert record["date"] == "1970-01-01T00:00:00Z"
+    assert set(record) == {
+        "date",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "average",
+        "barCount",
+    }
+
+
+def test_between_returns_view():
+    series = _series([0, 60, 120, 180], close=[1, 2, 3, 4])
+
+    subset = series.between(60, 180)
+
+    assert subset.timestamp.tolist() == [60, 120]
+    assert np.shares_memory(subset.close, series.close)
+
+
+def test_concat_later_series_wins_on_overlap():
+    old = _series([0, 60, 120], close=[1, 2, 3])
+    new = _series([120, 180], close=[30, 40])
+
+    merged = BarSeries.concat([old, new])
+
+    assert merged.timestamp.tolist() == [0, 60, 120, 180]
+    assert merged.close.tolist() == [1, 2, 30, 40]
+
+
+def test_resample_aggregates_ohlcv():
+    series = _series(
+        [0, 60, 120, 300],
+        open=[1, 2, 3, 4],
+        high=[5, 6, 7, 8],
+        low=[0.5, 0.1, 0.7, 0.8],
+        close=[2, 3, 4, 5],
+        volume=[10, 0, 30, 40],
+        average=[1, 9, 3, 4],
+        bar_count=[1, 2, 3, 4],
+    )
+
+    resampled = series.resample(300)
+
+    assert resampled.timestamp.tolist() == [0, 300]
+    assert resampled.open.tolist() == [1, 4]
+    assert resampled.high.tolist() == [7, 8]
+    assert resampled.low.tolist() == [0.1, 0.8]
+    assert resampled.close.tolist() == [4, 5]
+    assert resampled.volume.tolist() == [40, 40]
+    assert resampled.average.tolist() == [2.5, 4]
+    assert resampled.bar_count.tolist() == [6, 4]
+
+
+def test_resample_rejects_non_positive_width():
+    with pytest.raises(ValueError, match="must be positive"):
+        _series([0]).resample(0)
+
+
+def test_to_json_records_in_local_time():
+    """Non-UTC timezones produce wall-clock dates with offsets, across DST."""
+    series = _series([1710000000, 1710100000], close=[1.5, np.nan])
+
+    records = json.loads(series.to_json(tz=ZoneInfo("America/New_York")))
+
+    assert [r["date"] for r in records] == [
+        "2024-03-09T11:00:00-05:00",
+        "2024-03-10T15:46:40-04:00",
+    ]
+    assert records[1]["close"] is None
+
+
+def test_dates_with_half_hour_offsets():
+    series = _series([0], close=[1.0])
+    assert series.dates(ZoneInfo("Asia/Kolkata")).tolist() == [
+        "1970-01-01T05:30:00+05:30"
+    ]
+
+
+def test_to_json_columns():
+    series = _series([0, 60], close=[1.5, np.inf], bar_count=[3, 4])
+
+    columns = json.loads(series.to_json("columns"))
+
+    assert columns["timestamp"] == [0, 60]
+    assert columns["close"] == [1.5, None]
+    assert columns["bar_count"] == [3, 4]
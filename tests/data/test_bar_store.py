@@ -0,0 +1,136 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.data import BarKey, BarSeries, BarStore, bar_size_seconds
+
+KEY = BarKey("265598", "1 min", "TRADES", True)
+NOW = 10_000_000
+
+
+def _series(start, count, step=60):
+    timestamps = np.arange(start, start + count * step, step)
+    return BarSeries.from_columns(
+        {"timestamp": timestamps, "close": timestamps / 60.0, "bar_count": [1] * count}
+    )
+
+
+@pytest.mark.parametrize(
+    "bar_size, expected",
+    [("1 secs", 1), ("5 mins", 300), ("1 hour", 3600), ("1 day", 86400)],
+)
+def test_bar_size_seconds(bar_size, expected):
+    assert bar_size_seconds(bar_size) == expected
+
+
+def test_bar_size_seconds_invalid():
+    with pytest.raises(ValueError, match="Invalid bar size"):
+        bar_size_seconds("fortnight")
+
+
+def test_append_and_read_range(tmp_path):
+    store = BarStore(tmp_path, index_stride=4)
+    assert store.append(KEY, _series(0, 20), now=NOW) == 20
+
+    series = store.read_range(KEY, start=300, end=600)
+
+    assert series.timestamp.tolist() == [300, 360, 420, 480, 540]
+    assert series.close.tolist() == [5, 6, 7, 8, 9]
+    assert isinstance(series.close.base, np.memmap)
+
+
+def test_read_range_uses_sparse_index_boundaries(tmp_path):
+    store = BarStore(tmp_path, index_stride=4)
+    store.append(KEY, _series(0, 10), now=NOW)
+
+    # Bounds on, between and beyond index entries
+    assert store.read_range(KEY, start=240, end=241).timestamp.tolist() == [240]
+    assert store.read_range(KEY, start=250, end=300).timestamp.tolist() == []
+    assert len(store.read_range(KEY, start=-100, end=10_000)) == 10
+    assert len(store.read_range(KEY)) == 10
+
+
+def test_read_range_missing_series(tmp_path):
+    assert BarStore(tmp_path).read_range(KEY) is None
+
+
+def test_append_only_adds_newer_bars(tmp_path):
+    store = BarStore(tmp_path, index_stride=4)
+    store.append(KEY, _series(0, 6), now=NOW)
+
+    # Overlapping fetch: only bars after the stored tail are appended
+    assert store.append(KEY, _series(180, 6), now=NOW) == 3
+
+    series = store.read_range(KEY)
+    assert series.timestamp.tolist() == [0, 60, 120, 180, 240, 300, 360, 420, 480]
+    index = np.fromfile(tmp_path / KEY.relative_path() / "index.bin", dtype=np.int64)
+    assert index.tolist() == [0, 240, 480]
+
+
+def test_append_consecutive_sessions_records_gap(tmp_path):
+    """A fetch starting after the stored tail (the next session) is kept."""
+    store = BarStore(tmp_path, index_stride=100)
+    monday = _series(0, 390)
+    tuesday = _series(86400, 390)
+
+    assert store.append(KEY, monday, now=NOW) == 390
+    assert store.append(KEY, tuesday, now=NOW) == 390
+
+    assert store.length(KEY) == 780
+    assert store.coverage(KEY) == [(0, 390 * 60), (86400, 86400 + 390 * 60)]
+    series = store.read_range(KEY, start=86400)
+    assert series.timestamp.tolist() == tuesday.timestamp.tolist()
+
+
+def test_overlapping_fetch_extends_covered_range(tmp_path):
+    store = BarStore(tmp_path)
+    store.append(KEY, _series(0, 3), now=NOW)
+    store.append(KEY, _series(6000, 3), now=NOW)
+
+    # Overlapping the last range extends it; bars only ever append after the
+    # tail, so the earlier gap stays uncovered
+    store.append(KEY, _series(0, 110), now=NOW)
+
+    assert store.coverage(KEY) == [(0, 180), (6000, 6600)]
+    assert store.length(KEY) == 6 + 7
+
+
+def test_coverage_of_store_written_without_ranges(tmp_path):
+    store = BarStore(tmp_path)
+    store.append(KEY, _series(0, 3), now=NOW)
+    meta_path = tmp_path / KEY.relative_path() / "meta.json"
+    meta = json.loads(meta_path.read_text())
+    del meta["ranges"]
+    meta_path.write_text(json.dumps(meta))
+
+    assert store.coverage(KEY) == [(0, 180)]
+
+
+def test_append_skips_incomplete_bars(tmp_path):
+    store = BarStore(tmp_path)
+
+    # The bar starting at 120 ends at 180, after "now"
+    assert store.append(KEY, _series(0, 3), now=150) == 2
+
+
+def test_readers_ignore_uncommitted_rows(tmp_path):
+    store = BarStore(tmp_path)
+    store.append(KEY, _series(0, 3), now=NOW)
+
+    # Simulate an interrupted append: data written but length not published
+    path = tmp_path / KEY.relative_path()
+    with (path / "timestamp.bin").open("ab") as f:
+        f.write(np.array([999], dtype=np.int64).tobytes())
+
+    assert store.read_range(KEY).timestamp.tolist() == [0, 60, 120]
+
+    # The next append overwrites the stale bytes
+    store.append(KEY, _series(120, 2), now=NOW)
+    assert store.read_range(KEY).timestamp.tolist() == [0, 60, 120, 180]
+    assert json.loads((path / "meta.json").read_text())["length"] == 4
+
+
+def test_invalid_index_stride(tmp_path):
+    with pytest.raises(ValueError, match="must be positive"):
+        BarStore(tmp_path, index_stride=0)
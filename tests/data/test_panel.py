@@ -0,0 +1,63 @@
+import json
+import math
+
+import pytest
+
+from app.data import BarSeries, Panel
+
+
+def _series(timestamps, close):
+    return BarSeries.from_columns({"timestamp": timestamps, "close": close})
+
+
+def _panel_series():
+    return {
+        "AAPL": _series([0, 60, 120], [1.0, 2.0, 3.0]),
+        "MSFT": _series([60, 180], [10.0, 20.0]),
+    }
+
+
+def test_outer_join_uses_union_of_timestamps():
+    panel = Panel.align(_panel_series())
+
+    assert panel.labels == ("AAPL", "MSFT")
+    assert panel.timestamp.tolist() == [0, 60, 120, 180]
+    assert panel.values.shape == (4, 2)
+    aapl, msft = panel.values.T.tolist()
+    assert aapl[:3] == [1.0, 2.0, 3.0] and math.isnan(aapl[3])
+    assert math.isnan(msft[0]) and msft[1] == 10.0 and msft[3] == 20.0
+
+
+def test_inner_join_keeps_common_timestamps():
+    panel = Panel.align(_panel_series(), how="inner")
+
+    assert panel.timestamp.tolist() == [60]
+    assert panel.values.tolist() == [[2.0, 10.0]]
+
+
+def test_forward_fill_carries_previous_value():
+    panel = Panel.align(_panel_series(), ffill=True)
+
+    columns = json.loads(panel.to_json())["columns"]
+    assert columns["AAPL"] == [1.0, 2.0, 3.0, 3.0]
+    # No value before the first MSFT bar to carry forward
+    assert columns["MSFT"] == [None, 10.0, 10.0, 20.0]
+
+
+def test_to_json_replaces_missing_with_null():
+    series = _panel_series()
+    series["EMPTY"] = BarSeries.empty()
+
+    result = json.loads(Panel.align(series, field="close").to_json())
+
+    assert result["field"] == "close"
+    assert result["timestamp"] == [0, 60, 120, 180]
+    assert result["columns"]["AAPL"] == [1.0, 2.0, 3.0, None]
+    assert result["columns"]["EMPTY"] == [None] * 4
+
+
+def test_align_rejects_invalid_arguments():
+    with pytest.raises(ValueError):
+        Panel.align(_panel_series(), how="left")
+    with pytest.raises(ValueError):
+        Panel.align(_panel_series(), field="timestamp")
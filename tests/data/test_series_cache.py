@@ -0,0 +1,111 @@
+import pytest
+from ib_insync import Contract
+
+from app.data import BarKey, BarSeries, SeriesCache
+from app.data.series_cache import decode_cursor, duration_since, encode_cursor
+
+KEY = BarKey("265598", "1 min", "TRADES", True)
+
+
+class FakeClock:
+    def __init__(self, now: float) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _series(timestamps, close):
+    return BarSeries.from_columns({"timestamp": timestamps, "close": close})
+
+
+def test_merge_replaces_incomplete_last_bar():
+    cache = SeriesCache(clock=FakeClock(200))
+    cache.put(KEY, _series([0, 60, 120], [1, 2, 3]))
+
+    merged = cache.merge(KEY, _series([120, 180], [3.5, 4]))
+
+    assert merged.timestamp.tolist() == [0, 60, 120, 180]
+    assert merged.close.tolist() == [1, 2, 3.5, 4]
+    assert cache.get(KEY).series is merged
+
+
+def test_merge_replaces_series_it_does_not_adjoin():
+    cache = SeriesCache(clock=FakeClock(200))
+    contract = Contract(conId=265598)
+    cache.put(KEY, _series([0, 60], [1, 2]), contract)
+
+    merged = cache.merge(KEY, _series([600, 660], [5, 6]))
+
+    assert merged.timestamp.tolist() == [600, 660]
+    # The resolved contract is kept across updates
+    assert cache.get(KEY).contract is contract
+
+
+def test_covers_requires_bars_from_start():
+    cache = SeriesCache()
+    cache.put(KEY, _series([60, 120], [1, 2]))
+    entry = cache.get(KEY)
+
+    assert cache.covers(entry, 60)
+    assert cache.covers(entry, 90)
+    assert not cache.covers(entry, 0)
+    cache.put(KEY, BarSeries.empty())
+    assert not cache.covers(cache.get(KEY), 60)
+
+
+def test_put_trims_bars_and_evicts_least_recent():
+    cache = SeriesCache(max_entries=1, max_bars=2)
+    other = BarKey("1", "1 min", "TRADES", True)
+
+    kept = cache.put(KEY, _series([0, 60, 120], [1, 2, 3]))
+    assert kept.timestamp.tolist() == [60, 120]
+
+    cache.put(other, _series([0], [1]))
+    assert cache.get(KEY) is None
+    assert len(cache) == 1
+
+
+def test_entry_is_fresh_within_min_refresh():
+    clock = FakeClock(100)
+    cache = SeriesCache(min_refresh=5, clock=clock)
+    cache.put(KEY, _series([0], [1]))
+
+    assert cache.is_fresh(cache.get(KEY))
+    clock.now += 5
+    assert not cache.is_fresh(cache.get(KEY))
+
+
+def test_tail_duration_covers_last_bar():
+    cache = SeriesCache(clock=FakeClock(150))
+    series = _series([60, 120], [1, 2])
+
+    assert cache.tail_duration(series, "1 min") == "90 S"
+    assert cache.tail_duration(series, "1 day") == "2 D"
+
+    cache = SeriesCache(clock=FakeClock(3 * 86400))
+    assert cache.tail_duration(series, "1 min") == "3 D"
+
+
+def test_duration_since_switches_to_days_and_years():
+    assert duration_since(0, 3540, "1 min") == "3600 S"
+    assert duration_since(0, 2 * 86400, "1 min") == "3 D"
+    assert duration_since(0, 400 * 86400, "1 day") == "2 Y"
+
+
+def test_next_cursor_repeats_incomplete_last_bar():
+    series = _series([0, 60], [1, 2])
+
+    incomplete = SeriesCache(clock=FakeClock(90)).next_cursor(KEY, series, "1 min")
+    complete = SeriesCache(clock=FakeClock(120)).next_cursor(KEY, series, "1 min")
+
+    assert decode_cursor(incomplete, KEY) == 60
+    assert decode_cursor(complete, KEY) == 61
+
+
+def test_cursor_rejects_other_series_and_garbage():
+    cursor = encode_cursor(KEY, 60)
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, KEY._replace(bar_size="5 mins"))
+    with pytest.raises(ValueError):
+        decode_cursor("not a cursor", KEY)
@@ -0,0 +1,86 @@
+import pytest
+from ib_insync import Contract
+
+from app.ib.contracts import ContractSpec, contract_key
+
+
+@pytest.mark.parametrize(
+    "spec, expected",
+    [
+        (ContractSpec(con_id=265598), True),
+        (ContractSpec(symbol="AAPL"), False),
+        (ContractSpec(symbol="AAPL", primary_exchange="NASDAQ"), True),
+        (ContractSpec(symbol="EUR", sec_type="CASH", exchange="IDEALPRO"), True),
+        (ContractSpec(symbol="EUR", sec_type="CASH"), False),
+        (
+            ContractSpec(
+                symbol="ES",
+                sec_type="FUT",
+                exchange="CME",
+                last_trade_date_or_contract_month="202412",
+            ),
+            True,
+        ),
+        (ContractSpec(symbol="ES", sec_type="FUT", exchange="CME"), False),
+        (
+            ContractSpec(
+                symbol="AAPL",
+                sec_type="OPT",
+                last_trade_date_or_contract_month="20241220",
+                strike=200,
+                right="C",
+            ),
+            True,
+        ),
+        (ContractSpec(symbol="AAPL", sec_type="OPT"), False),
+        (ContractSpec(local_symbol="ESZ4", sec_type="FUT", exchange="CME"), True),
+        # SMART does not route futures, so the local symbol must be looked up
+        (ContractSpec(local_symbol="ESZ4", sec_type="FUT"), False),
+        (ContractSpec(local_symbol="ESZ4", sec_type="FUT", currency=""), False),
+        (ContractSpec(local_symbol="AAPL  241220C00200000", sec_type="OPT"), True),
+        (ContractSpec(local_symbol="AAPL"), False),
+        (ContractSpec(local_symbol="AAPL", primary_exchange="NASDAQ"), True),
+        (ContractSpec(local_symbol="XYZ", sec_type="BOND", exchange="NYSE"), False),
+        (ContractSpec(symbol="XYZ", sec_type="BOND", exchange="SMART"), False),
+    ],
+)
+def test_is_fully_specified(spec, expected):
+    assert spec.is_fully_specified is expected
+
+
+def test_to_contract_with_con_id():
+    contract = ContractSpec(con_id=265598, exchange="NASDAQ").to_contract()
+    assert contract.conId == 265598
+    assert contract.exchange == "NASDAQ"
+    assert contract.symbol == ""
+
+
+def test_to_contract_maps_fields():
+    contract = ContractSpec(
+        symbol="AAPL",
+        sec_type="opt",
+        last_trade_date_or_contract_month="20241220",
+        strike=200,
+        right="C",
+        multiplier="100",
+    ).to_contract()
+
+    assert contract.secType == "OPT"
+    assert contract.strike == 200
+    assert contract.right == "C"
+    assert contract.multiplier == "100"
+
+
+def test_describe():
+    assert ContractSpec(symbol="AAPL").describe() == "symbol 'AAPL'"
+    assert ContractSpec(con_id=1).describe() == "conId 1"
+
+
+def test_contract_key():
+    assert contract_key(Contract(conId=265598, symbol="AAPL")) == "265598"
+    assert (
+        contract_key(
+            Contract(symbol="ES", secType="FUT", exchange="CME", currency="USD")
+        )
+        == "ES-FUT-CME-USD"
+    )
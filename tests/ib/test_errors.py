@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+from ib_insync import RequestError
+
+from app.ib.errors import CircuitOpenError, IBError, classify_error
+
+
+@pytest.mark.parametrize(
+    "code, message, status_code, retryable",
+    [
+        (200, "No security definition has been found", 404, False),
+        (321, "Error validating request", 400, False),
+        (354, "Requested market data is not subscribed", 403, False),
+        (
+            162,
+            "Historical Market Data Service error message:API historical data query cancelled",
+            502,
+            False,
+        ),
+        (
+            162,
+            "Historical Market Data Service error message:Pacing violation",
+            429,
+            False,
+        ),
+        (504, "Not connected", 503, True),
+        (1100, "Connectivity between IB and TWS has been lost", 503, True),
+        (9999, "Something new", 502, False),
+    ],
+)
+def test_classify_request_error(code, message, status_code, retryable):
+    error = classify_error(RequestError(1, code, message), "historical data")
+
+    assert error.status_code == status_code
+    assert error.retryable is retryable
+    assert error.code == code
+    assert "historical data" in str(error)
+
+
+def test_classify_no_data():
+    error = classify_error(
+        RequestError(1, 162, "HMDS query returned no data: AAPL@SMART Trades"),
+        "historical data",
+    )
+    assert error.no_data
+
+
+def test_classify_timeout_and_connection_errors():
+    timeout = classify_error(asyncio.TimeoutError(), "connect")
+    refused = classify_error(ConnectionRefusedError("refused"), "connect")
+
+    assert (timeout.status_code, timeout.retryable) == (504, True)
+    assert (refused.status_code, refused.retryable) == (503, True)
+
+
+def test_classify_unrelated_error_returns_none():
+    assert classify_error(RuntimeError("Boom!"), "connect") is None
+
+
+def test_ib_error_headers():
+    assert IBError("failed").headers is None
+    assert CircuitOpenError(retry_after=2.2).headers == {"Retry-After": "3"}
@@ -1,5 +1,5 @@
 import os
-from unittest.mock import AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -29,6 +29,12 @@ def test_ib_client_manager_defaults_used_when_config_missing(mock_get_settings):
     assert isinstance(manager.client_id, int)
 
 
+def test_ib_client_manager_uses_given_client_id():
+    with patch("app.ib.ib_client_manager.IB", autospec=True):
+        manager = IBClientManager(client_id=0)
+    assert manager.client_id == 0
+
+
 @patch("app.ib.ib_client_manager.get_settings")
 def test_ib_client_manager_uses_config(mock_get_settings):
     # Simulate valid IB settings
@@ -55,6 +61,8 @@ async def test_ib_client_manager_connect_and_disconnect(
     mock_settings = MagicMock()
     mock_settings.ib.host = "localhost"
     mock_settings.ib.port = 4001
+    mock_settings.ib.connect_timeout = 5
+    mock_settings.ib.request_timeout = 10
     mock_get_settings.return_value = mock_settings
 
     # Mock IB instance with awaitable connectAsync
@@ -69,8 +77,9 @@ async def test_ib_client_manager_connect_and_disconnect(
     # Test connect
     await manager.connect()
     mock_ib_instance.connectAsync.assert_awaited_once_with(
-        manager.host, manager.port, manager.client_id
+        manager.host, manager.port, manager.client_id, timeout=ANY
     )
+    assert 0 < mock_ib_instance.connectAsync.await_args.kwargs["timeout"] <= 5
 
     # Test disconnect
     manager.disconnect()
@@ -85,6 +94,8 @@ async def test_ib_client_manager_async_context(mock_get_settings, mock_ib_class)
     mock_settings = MagicMock()
     mock_settings.ib.host = "localhost"
     mock_settings.ib.port = 4001
+    mock_settings.ib.connect_timeout = 5
+    mock_settings.ib.request_timeout = 10
     mock_get_settings.return_value = mock_settings
 
     # Create IB mock instance with proper async and sync methods
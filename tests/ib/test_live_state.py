@@ -0,0 +1,157 @@
+import math
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from ib_insync import IB, AccountValue, Contract, Order, Position, Trade
+
+from app.ib.live_state import (
+    LiveIBState,
+    _live_manager,
+    contract_to_dict,
+    portfolio_item_to_dict,
+    trade_to_dict,
+)
+
+
+def _manager():
+    manager = MagicMock()
+    manager.ib = IB()
+    manager.ib.isConnected = MagicMock(return_value=False)
+
+    async def connect():
+        manager.ib.isConnected.return_value = True
+        return manager.ib
+
+    manager.connect = AsyncMock(side_effect=connect)
+    manager.ib.reqAllOpenOrdersAsync = AsyncMock(return_value=[])
+    return manager
+
+
+def test_contract_to_dict_drops_defaults():
+    contract = Contract(conId=265598, symbol="AAPL", secType="STK")
+    assert contract_to_dict(contract) == {
+        "conId": 265598,
+        "symbol": "AAPL",
+        "secType": "STK",
+    }
+
+
+def test_portfolio_item_to_dict_replaces_nan():
+    item = MagicMock()
+    item._asdict.return_value = {"position": 1.0, "marketPrice": math.nan}
+    item.contract = Contract(symbol="AAPL")
+
+    values = portfolio_item_to_dict(item)
+    assert values["marketPrice"] is None
+    assert values["contract"] == {"symbol": "AAPL"}
+
+
+def test_trade_to_dict_hides_unset_prices():
+    trade = Trade(
+        contract=Contract(symbol="AAPL"),
+        order=Order(orderId=7, action="BUY", totalQuantity=10, orderType="MKT"),
+    )
+    values = trade_to_dict(trade)
+    assert values["order"]["orderId"] == 7
+    assert values["order"]["lmtPrice"] is None
+
+
+@pytest.mark.asyncio
+async def test_live_state_connects_once():
+    manager = _manager()
+    state = LiveIBState(manager_factory=lambda: manager)
+
+    assert await state.ib() is manager.ib
+    assert await state.ib() is manager.ib
+    manager.connect.assert_awaited_once()
+    assert state.connected
+
+
+@pytest.mark.asyncio
+async def test_live_state_loads_open_orders_of_all_clients():
+    manager = _manager()
+    state = LiveIBState(manager_factory=lambda: manager)
+
+    await state.ib()
+    manager.ib.reqAllOpenOrdersAsync.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_live_state_disconnects_when_order_sync_fails():
+    manager = _manager()
+    manager.ib.reqAllOpenOrdersAsync.side_effect = ConnectionError("broken")
+    state = LiveIBState(manager_factory=lambda: manager)
+
+    with pytest.raises(ConnectionError):
+        await state.ib()
+    manager.disconnect.assert_called_once()
+    assert state._manager is None
+
+
+def test_live_manager_uses_configured_client_id():
+    with patch("app.ib.ib_client_manager.IB", autospec=True):
+        manager = _live_manager()
+    assert manager.client_id == 0
+
+
+@pytest.mark.asyncio
+async def test_live_state_reconnects_after_disconnect():
+    managers = [_manager(), _manager()]
+    state = LiveIBState(manager_factory=lambda: managers.pop(0))
+
+    first = await state.ib()
+    first.isConnected.return_value = False
+
+    second = await state.ib()
+    assert second is not first
+
+
+@pytest.mark.asyncio
+async def test_live_state_publishes_events_to_subscribers():
+    manager = _manager()
+    state = LiveIBState(manager_factory=lambda: manager)
+    await state.ib()
+    subscriber = state.subscribe()
+
+    manager.ib.positionEvent.emit(
+        Position("DU123", Contract(conId=1, symbol="AAPL"), 10.0, 150.0)
+    )
+    manager.ib.accountValueEvent.emit(
+        AccountValue("DU123", "NetLiquidation", "1000", "USD", "")
+    )
+
+    event = subscriber.queue.get_nowait()
+    assert event["type"] == "position"
+    assert event["data"]["position"] == 10.0
+    assert subscriber.queue.get_nowait()["data"]["tag"] == "NetLiquidation"
+
+    state.unsubscribe(subscriber)
+    manager.ib.positionEvent.emit(
+        Position("DU123", Contract(conId=1, symbol="AAPL"), 11.0, 150.0)
+    )
+    assert subscriber.queue.empty()
+
+
+@pytest.mark.asyncio
+async def test_live_state_drops_oldest_event_when_subscriber_is_slow():
+    manager = _manager()
+    state = LiveIBState(manager_factory=lambda: manager, max_queue=1)
+    await state.ib()
+    subscriber = state.subscribe()
+
+    for quantity in (1.0, 2.0):
+        manager.ib.positionEvent.emit(Position("DU123", Contract(), quantity, 0.0))
+
+    assert subscriber.overflowed
+    assert subscriber.queue.get_nowait()["data"]["position"] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_live_state_close_disconnects():
+    manager = _manager()
+    state = LiveIBState(manager_factory=lambda: manager)
+    await state.ib()
+
+    state.close()
+    manager.disconnect.assert_called_once()
+    assert not state.connected
@@ -0,0 +1,123 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.ib.errors import IBError
+from app.ib.pacing import PacingBudget, paced
+from app.ib.resilience import Deadline
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_budget_with_room_has_no_wait():
+    budget = PacingBudget(max_requests=3, window=60, clock=FakeClock())
+    budget.record()
+    assert budget.used == 1
+    assert budget.projected_wait() == 0
+    assert budget.projected_wait(ahead=1) == 0
+
+
+def test_exhausted_budget_waits_for_oldest_request():
+    clock = FakeClock()
+    budget = PacingBudget(max_requests=2, window=60, clock=clock)
+    budget.record()
+    clock.now += 10
+    budget.record()
+
+    assert budget.projected_wait() == pytest.approx(50)
+    assert budget.projected_wait(ahead=1) == pytest.approx(60)
+    # Two requests ahead take the freed slots, this one waits a full window
+    assert budget.projected_wait(ahead=2) == pytest.approx(110)
+
+
+def test_requests_expire_from_window():
+    clock = FakeClock()
+    budget = PacingBudget(max_requests=1, window=60, clock=clock)
+    budget.record()
+    clock.now += 60
+    assert budget.used == 0
+    assert budget.projected_wait() == 0
+
+
+async def test_paced_records_every_attempt():
+    budget = PacingBudget(max_requests=10, window=60, clock=FakeClock())
+
+    async def request() -> str:
+        return "ok"
+
+    attempt = paced(request, budget)
+    assert await attempt() == "ok"
+    assert await attempt() == "ok"
+    assert budget.used == 2
+
+
+async def test_paced_waits_for_budget(monkeypatch):
+    clock = FakeClock()
+    budget = PacingBudget(max_requests=1, window=60, clock=clock)
+    budget.record()
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr("app.ib.pacing.asyncio.sleep", sleep)
+
+    async def request() -> str:
+        return "ok"
+
+    assert await paced(request, budget)() == "ok"
+    assert sleeps == [pytest.approx(60)]
+    assert budget.used == 1
+
+
+async def test_concurrent_waits_reserve_consecutive_slots(monkeypatch):
+    clock = FakeClock()
+    budget = PacingBudget(max_requests=1, window=60, clock=clock)
+    budget.record()
+    sleeps = []
+
+    async def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+
+    monkeypatch.setattr("app.ib.pacing.asyncio.sleep", sleep)
+
+    await budget.acquire()
+    await budget.acquire()
+    assert sleeps == [pytest.approx(60), pytest.approx(120)]
+
+
+async def test_paced_rejects_wait_past_deadline():
+    clock = FakeClock()
+    budget = PacingBudget(max_requests=1, window=60, clock=clock)
+    budget.record()
+    request = AsyncMock()
+
+    with pytest.raises(IBError) as exc_info:
+        await paced(request, budget, Deadline(10, clock=clock))()
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers == {"Retry-After": "60"}
+    request.assert_not_called()
+    assert budget.used == 1
+
+
+async def test_cancelled_wait_frees_its_slot():
+    clock = FakeClock()
+    budget = PacingBudget(max_requests=1, window=60, clock=clock)
+    budget.record()
+
+    task = asyncio.ensure_future(budget.acquire())
+    await asyncio.sleep(0)
+    assert budget.used == 2
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert budget.used == 1
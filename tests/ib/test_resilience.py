@@ -0,0 +1,189 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+from ib_insync import RequestError
+
+from app.ib.errors import CircuitOpenError, IBError
+from app.ib.resilience import CircuitBreaker, Deadline, call_with_retries
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_deadline_remaining_and_timeout():
+    clock = FakeClock()
+    deadline = Deadline(10, clock=clock)
+
+    clock.now = 4
+    assert deadline.remaining() == 6
+    assert deadline.timeout(2) == 2
+    assert not deadline.expired
+
+    clock.now = 11
+    assert deadline.remaining() == 0
+    assert deadline.expired
+
+
+def test_circuit_breaker_opens_and_probes():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+    assert exc_info.value.retry_after == 30
+
+    # After the reset timeout exactly one probe is let through
+    clock.now = 31
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed probe re-opens the breaker
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # A successful probe closes it
+    clock.now = 62
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_recovers_from_transient_error():
+    breaker = CircuitBreaker()
+    factory = AsyncMock(side_effect=[ConnectionRefusedError("refused"), "ok"])
+
+    result = await call_with_retries(
+        factory, Deadline(5), "connect", retries=2, backoff=0.001, breaker=breaker
+    )
+
+    assert result == "ok"
+    assert factory.await_count == 2
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_gives_up_after_retries():
+    breaker = CircuitBreaker(failure_threshold=10)
+    factory = AsyncMock(side_effect=ConnectionRefusedError("refused"))
+
+    with pytest.raises(IBError) as exc_info:
+        await call_with_retries(
+            factory, Deadline(5), "connect", retries=2, backoff=0.001, breaker=breaker
+        )
+
+    assert exc_info.value.status_code == 503
+    assert factory.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_does_not_retry_request_errors():
+    factory = AsyncMock(side_effect=RequestError(1, 200, "No security definition"))
+
+    with pytest.raises(IBError) as exc_info:
+        await call_with_retries(
+            factory, Deadline(5), "contract details", breaker=CircuitBreaker()
+        )
+
+    assert exc_info.value.status_code == 404
+    assert factory.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_times_out_at_deadline():
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(IBError) as exc_info:
+        await call_with_retries(
+            hang, Deadline(0.05), "historical data", retries=0, breaker=CircuitBreaker()
+        )
+
+    assert exc_info.value.status_code == 504
+
+
+@pytest.mark.asyncio
+async def test_deadline_timeouts_leave_breaker_closed():
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    for _ in range(3):
+        with pytest.raises(IBError) as exc_info:
+            await call_with_retries(
+                hang, Deadline(0.02), "historical data", breaker=breaker
+            )
+        assert exc_info.value.status_code == 504
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_per_phase_timeouts_count_as_gateway_failures():
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    async def hang():
+        await asyncio.sleep(10)
+
+    with pytest.raises(IBError) as exc_info:
+        await call_with_retries(
+            hang, Deadline(5), "connect", timeout=0.02, retries=0, breaker=breaker
+        )
+
+    assert exc_info.value.status_code == 504
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_fails_fast_when_circuit_open():
+    breaker = CircuitBreaker(failure_threshold=1)
+    breaker.record_failure()
+    factory = AsyncMock()
+
+    with pytest.raises(CircuitOpenError):
+        await call_with_retries(factory, Deadline(5), "connect", breaker=breaker)
+
+    factory.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_passes_through_unrelated_errors():
+    breaker = CircuitBreaker()
+
+    with pytest.raises(RuntimeError):
+        await call_with_retries(
+            AsyncMock(side_effect=RuntimeError("Boom!")),
+            Deadline(5),
+            "historical data",
+            breaker=breaker,
+        )
+
+
+@pytest.mark.asyncio
+async def test_call_with_retries_ignores_errors_raised_before_reaching_ib():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+
+    with pytest.raises(IBError):
+        await call_with_retries(
+            AsyncMock(side_effect=IBError("Budget exhausted", status_code=429)),
+            Deadline(5),
+            "historical data",
+            breaker=breaker,
+        )
+    # The earlier failure still counts towards opening the breaker
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
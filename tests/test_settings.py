@@ -74,3 +74,12 @@ def test_get_settings_is_cached(temp_config_file, monkeypatch):
     settings_1 = get_settings(config_path=temp_config_file)
     settings_2 = get_settings(config_path=temp_config_file)
     assert settings_1 is settings_2
+
+
+def test_storage_settings_default_to_disabled(temp_config_file, monkeypatch):
+    get_settings.cache_clear()
+    monkeypatch.setattr("app.settings.get_resource_path", lambda p: Path(p))
+
+    settings = get_settings(config_path=temp_config_file)
+    assert settings.storage.enabled is False
+    assert settings.storage.index_stride > 0
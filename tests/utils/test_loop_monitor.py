@@ -0,0 +1,54 @@
+import asyncio
+import contextlib
+import logging
+import time
+from unittest.mock import MagicMock
+
+from app.utils.loop_monitor import (
+    install_slow_callback_detector,
+    monitor_loop_lag,
+    uninstall_slow_callback_detector,
+)
+
+
+async def test_slow_callback_is_reported(caplog):
+    original = asyncio.Handle._run
+    install_slow_callback_detector(0.01)
+    try:
+        with caplog.at_level(logging.WARNING, logger="app.utils.loop_monitor"):
+            asyncio.get_running_loop().call_soon(time.sleep, 0.02)
+            await asyncio.sleep(0.05)
+    finally:
+        uninstall_slow_callback_detector()
+
+    assert asyncio.Handle._run is original
+    assert any("Slow event-loop callback" in r.message for r in caplog.records)
+
+
+async def test_loops_bypassing_handles_use_debug_mode(monkeypatch):
+    original = asyncio.Handle._run
+    loop = MagicMock()  # e.g. uvloop, which is not an asyncio.BaseEventLoop
+    monkeypatch.setattr("app.utils.loop_monitor.asyncio.get_running_loop", lambda: loop)
+
+    install_slow_callback_detector(0.05)
+    try:
+        assert asyncio.Handle._run is original
+        loop.set_debug.assert_called_once_with(True)
+        assert loop.slow_callback_duration == 0.05
+    finally:
+        uninstall_slow_callback_detector()
+
+    loop.set_debug.assert_called_with(False)
+
+
+async def test_loop_lag_is_reported(caplog):
+    with caplog.at_level(logging.WARNING, logger="app.utils.loop_monitor"):
+        task = asyncio.create_task(monitor_loop_lag(0.01, 0.01))
+        await asyncio.sleep(0)
+        time.sleep(0.05)  # block the loop past the next tick
+        await asyncio.sleep(0.03)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    assert any("Event loop lagged" in r.message for r in caplog.records)
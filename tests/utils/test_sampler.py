@@ -0,0 +1,34 @@
+import threading
+import time
+
+import pytest
+
+from app.utils.sampler import sample_thread, to_collapsed
+
+
+def _busy_wait(stop: threading.Event) -> None:
+    while not stop.is_set():
+        time.sleep(0.001)
+
+
+def test_sample_thread_collects_stacks():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_wait, args=(stop,))
+    worker.start()
+    try:
+        counts = sample_thread(worker.ident, duration=0.05, interval=0.005)
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sum(counts.values()) > 0
+    assert all("_busy_wait" in stack for stack in counts)
+
+
+def test_sample_thread_rejects_own_thread():
+    with pytest.raises(ValueError):
+        sample_thread(threading.get_ident(), duration=0.01, interval=0.001)
+
+
+def test_to_collapsed_orders_by_count():
+    assert to_collapsed({"a;b": 1, "a;c": 3}) == "a;c 3\na;b 1\n"
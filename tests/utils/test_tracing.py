@@ -0,0 +1,73 @@
+import json
+import time
+
+from app.utils.tracing import Tracer, get_tracer, request_span, span
+
+
+def _events(path):
+    # The trace array is left open for appending; close it to parse
+    return json.loads(path.read_text().rstrip(",\n") + "]")
+
+
+def test_tracer_writes_chrome_trace_events(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer(path)
+
+    with tracer.span("outer", symbol="AAPL") as args:
+        args["bars"] = 3
+    tracer.counter("event_loop_lag", lag_ms=1.5)
+    tracer.close()
+
+    outer, lag = _events(path)
+    assert outer["name"] == "outer"
+    assert outer["ph"] == "X"
+    assert outer["dur"] >= 0
+    assert outer["args"] == {"symbol": "AAPL", "bars": 3}
+    assert lag["ph"] == "C"
+    assert lag["args"] == {"lag_ms": 1.5}
+
+
+def test_tracer_appends_to_existing_file(tmp_path):
+    path = tmp_path / "trace.json"
+    for name in ("first", "second"):
+        tracer = Tracer(path)
+        tracer.complete(name, 0, 1)
+        tracer.close()
+
+    assert [e["name"] for e in _events(path)] == ["first", "second"]
+
+
+def test_tracer_writes_in_the_background(tmp_path):
+    path = tmp_path / "trace.json"
+    tracer = Tracer(path, flush_interval=0.2)
+
+    tracer.counter("event_loop_lag", lag_ms=1.0)
+    assert not path.exists()  # recording an event never touches the file
+    deadline = time.monotonic() + 2
+    while not path.exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    tracer.close()
+
+    assert [e["name"] for e in _events(path)] == ["event_loop_lag"]
+
+
+def test_request_span_groups_nested_spans(tmp_path, monkeypatch):
+    tracer = Tracer(tmp_path / "trace.json")
+    monkeypatch.setattr("app.utils.tracing.get_tracer", lambda: tracer)
+
+    with request_span("GET /a"):
+        with span("ib:historical data"):
+            pass
+    with request_span("GET /b"):
+        pass
+    tracer.close()
+
+    inner, first, second = _events(tracer.path)
+    assert inner["tid"] == first["tid"]
+    assert first["tid"] != second["tid"]
+
+
+def test_span_is_noop_when_disabled():
+    assert get_tracer() is None
+    with span("encode", format="records") as args:
+        args["bars"] = 1